@@ -1,28 +1,102 @@
+import hmac
+import logging
 import os
+import signal
+import threading
 import pandas as pd
 import taipy.gui.builder as tgb
-from taipy.gui import Gui
+from taipy.gui import (
+    Gui,
+    State,
+    get_state_id,
+    invoke_callback,
+    invoke_long_callback,
+)
 from taipy.gui.gui_actions import download, navigate
 
+from core.binning import histogram_frame
+from core.cube import ProductionCube
+from core.export import EXPORT_FORMATS, export_frame
+from core.filter_index import (
+    build_filter_indexes,
+    filter_frame,
+    filter_key,
+    filter_rows,
+    select_rows,
+)
+from core.leaderboard import Leaderboard
+from core.pipeline import Node, Pipeline
+from core.prefix import CumulativeIndex
+from core.result_cache import ResultCache
+from core.selection import RowSelection
+from core.spatial import WellGrid, WellPresentation, bubble_sizes, level_of_detail
+from core.table_pager import TablePager, page_label
+from core.well_index import WellIndex
+from core.loader import load_datasets
+from core.reloader import DataWatcher
+from core.schema import validate_dataset
+from core.debounce import SessionDebouncer
+from core.metrics import RollingMetrics
+
 
 # ------------------------------------------------------------------
 # HELPERS
 # ------------------------------------------------------------------
 def download_filtered_prod(state):
-    csv_content = state.filtered_prod.to_csv(index=False).encode("utf-8")
-    return download(state, csv_content, name="filtered_prod_data.csv")
+    # written to disk in chunks and streamed from there, never one big string;
+    # the rows are resolved from the shared store, not kept in the session
+    with metrics.measure("callback", "download_filtered_prod"):
+        path, name = export_frame(
+            pipeline.value(state, "prod_rows"),
+            "filtered_prod_data",
+            state.export_format,
+        )
+    return download(state, path, name=name)
 
 
 def download_filtered_frac(state):
-    csv_content = state.filtered_frac.to_csv(index=False).encode("utf-8")
-    return download(state, csv_content, name="filtered_frac_data.csv")
+    with metrics.measure("callback", "download_filtered_frac"):
+        path, name = export_frame(
+            pipeline.value(state, "frac_rows"),
+            "filtered_frac_data",
+            state.export_format,
+        )
+    return download(state, path, name=name)
 
 
 # ------------------------------------------------------------------
 # CONFIG & DATA
 # ------------------------------------------------------------------
-MAX_TABLE_ROWS = 2000
+logging.basicConfig(level=logging.INFO)
+
+TABLE_PAGE_SIZE = 100  # rows per Data Explorer page, sliced on the server
 FRAC_SAMPLE_N = 5000
+DEPTH_HIST_BINS = 30
+LATERAL_HIST_BINS = 30
+MAP_MAX_MARKERS = 3000  # above this, the map shows quadtree clusters
+# Map metrics: value column, bubble size column, hover label and the
+# constant marker colors of their chart
+MAP_METRICS = {
+    "Oil": {
+        "column": "oil_cum_m3",
+        "size": "oil_size",
+        "label": "Oil (m³)",
+        "fill": "rgba(0,160,0,0.55)",
+        "border": "darkgreen",
+    },
+    "Gas": {
+        "column": "gas_cum_km3",
+        "size": "gas_size",
+        "label": "Gas (km³)",
+        "fill": "rgba(220,0,0,0.55)",
+        "border": "darkred",
+    },
+}
+TOP_WELLS_N = int(os.getenv("VM_TOP_WELLS_N", "20"))  # capped at leaderboard.MAX_N
+RESULT_CACHE_MB = int(os.getenv("VM_RESULT_CACHE_MB", "256"))
+PIPELINE_WORKERS = int(os.getenv("VM_PIPELINE_WORKERS", min(4, os.cpu_count() or 1)))
+DEBOUNCE_S = float(os.getenv("VM_DEBOUNCE_S", "0.15"))  # filter burst window
+ADMIN_TOKEN = os.getenv("VM_ADMIN_TOKEN")  # unset: no diagnostics page
 
 # Paths
 DATA_PATH_FRAC = "data/well_frac_data.csv"
@@ -32,23 +106,108 @@ DATA_PATH_COMP = 'data/completion_data.csv'
 HEADER1_IMAGE_PATH = "images/vm_map.png"
 HEADER2_IMAGE_PATH = "images/vm_rig_night.png"
 
-# CSV's
-frac = pd.read_csv(DATA_PATH_FRAC)
-prod = pd.read_csv(DATA_PATH_PROD)
-drill = pd.read_csv(DATA_PATH_DRILL)
-comp = pd.read_csv(DATA_PATH_COMP)
+DATA_PATHS = {
+    "frac": DATA_PATH_FRAC,
+    "prod": DATA_PATH_PROD,
+    "drill": DATA_PATH_DRILL,
+    "comp": DATA_PATH_COMP,
+}
+
+
+class DataSnapshot:
+    """One generation of the datasets and everything derived from them.
+
+    Read-only once built: a reload builds a new snapshot aside and swaps
+    it in by reassigning ``_data``. Callbacks read ``_data`` once and use
+    that snapshot throughout; pipeline nodes get the snapshot their run
+    was prepared with (the "data" dep), so a run never pairs an index of
+    one generation with the frame of another.
+    """
+
+    def __init__(self, fields):
+        vars(self).update(fields)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"DataSnapshot is read-only (setting {name!r})")
+
+
+def build_data(datasets, version=0):
+    """The data snapshot of ``datasets``: frames, indexes and LOV's."""
+    for name, df in datasets.items():
+        validate_dataset(name, df)
+    prod, frac = datasets["prod"], datasets["frac"]
+    prod_wells = WellIndex(prod)
+    cum_index = CumulativeIndex(prod, prod_wells.order)
+    well_grid = WellGrid(prod["Xcoor"], prod["Ycoor"])
+    latest = cum_index.latest_rows({}, (cum_index.year_min, cum_index.year_max))
+    return DataSnapshot(
+        {
+            "version": version,
+            "datasets": datasets,
+            "frac": frac,
+            "prod": prod,
+            "drill": datasets["drill"],
+            "comp": datasets["comp"],
+            # Inverted company/field/well_type indexes (row ids per value, per dataset)
+            "filter_indexes": build_filter_indexes(datasets),
+            # Per-well row permutation (rows are stored in year/month order)
+            "prod_wells": prod_wells,
+            "frac_wells": WellIndex(frac),
+            # Per-well prefix sums for year-range cumulative volumes
+            "cum_index": cum_index,
+            # Production rollup at (company, field, well_type, year, month) for KPIs
+            "production_cube": ProductionCube(prod),
+            # Quadtree over well coordinates for the map's level of detail
+            "well_grid": well_grid,
+            # Per-segment hover fragments, per-well quadtree keys and bubble scales
+            "well_presentation": WellPresentation(
+                prod.take(latest),
+                well_grid,
+                cum_index.segments,
+                [m["column"] for m in MAP_METRICS.values()],
+            ),
+            # Per-well peak cumulatives with precomputed top-N boards
+            "well_leaderboard": Leaderboard(
+                prod, cum_index, ["oil_cum_m3", "gas_cum_km3"]
+            ),
+            # LOV's
+            "company_lov": ["All"] + sorted(frac["company"].dropna().unique()),
+            "field_lov": ["All"] + sorted(frac["field"].dropna().unique()),
+            "well_type_lov": ["All"] + sorted(prod["well_type"].dropna().unique()),
+            "well_lov": sorted(prod_wells.offsets),
+            "year_min": int(prod["year"].min()),
+            "year_max": int(prod["year"].max()),
+            "prod_sort_lov": ["(stored order)"] + list(prod.columns),
+            "frac_sort_lov": ["(stored order)"] + list(frac.columns),
+        }
+    )
+
 
-prod["date"] = pd.to_datetime(
-    pd.DataFrame({"year": prod["year"], "month": prod["month"], "day": 31}),
-    errors="coerce",
-)
+# Datasets (year-partitioned Parquet store, kept in sync with the CSV's)
+# and everything derived from them; replaced as a whole by reload_data
+_data = build_data(load_datasets(DATA_PATHS))
+
+# Session variables that follow the data (initial values, see sync_data)
+company_lov = _data.company_lov
+field_lov = _data.field_lov
+well_type_lov = _data.well_type_lov
+well_lov = _data.well_lov
+year_min = _data.year_min
+year_max = _data.year_max
+prod_sort_lov = _data.prod_sort_lov
+frac_sort_lov = _data.frac_sort_lov
+
+# Version of the snapshot a session is synced with (see sync_data)
+data_version = _data.version
 
-# LOV's
-company_lov = ["All"] + sorted(frac["company"].dropna().unique())
-field_lov = ["All"] + sorted(frac["field"].dropna().unique())
-well_type_lov = ["All"] + sorted(prod["well_type"].dropna().unique())
-year_min = int(prod["year"].min())
-year_max = int(prod["year"].max())
+# Derived frames/KPIs shared by every session, keyed on the normalized filters
+result_cache = ResultCache(max_bytes=RESULT_CACHE_MB * 1024 * 1024)
+
+# Rolling per-stage/per-callback timings (diagnostics page, JSON logs)
+metrics = RollingMetrics()
+
+# Per-session coalescing of rapid filter changes
+debouncer = SessionDebouncer(DEBOUNCE_S)
 
 # Filters
 company_filter = "All"
@@ -56,23 +215,36 @@ field_filter = "All"
 well_type_filter = "All"
 year_range = [year_min, year_max]
 
-# Dataframes
-filtered_prod = prod.copy()
-filtered_frac = frac.copy()
-filtered_drill = drill.copy()
-filtered_comp = comp.copy()
-
-# speed helpers
-filtered_frac_sample = frac.copy()
+# Dataframes (the filtered rows themselves stay in the shared result
+# cache; sessions only hold what their pages bind)
+filtered_frac_sample = _data.frac
 filtered_prod_view = pd.DataFrame()
 filtered_frac_view = pd.DataFrame()
 
+# Data Explorer paging (1-based page, sort column, direction)
+prod_page_number = 1
+prod_page_count = 1
+prod_page_label = ""
+prod_sort = prod_sort_lov[0]
+prod_sort_desc = False
+frac_page_number = 1
+frac_page_count = 1
+frac_page_label = ""
+frac_sort = frac_sort_lov[0]
+frac_sort_desc = False
+
+# Downloads
+export_format_lov = list(EXPORT_FORMATS)
+export_format = "CSV (gzip)"
+
 # derived df's
 top_oil_wells_df = pd.DataFrame()
 top_gas_wells_df = pd.DataFrame()
 prod_time_df = pd.DataFrame()
 map_df = pd.DataFrame()
 wells_by_type_df = pd.DataFrame()
+depth_hist_df = pd.DataFrame()
+lateral_hist_df = pd.DataFrame()
 depth_by_type_df = pd.DataFrame()
 avg_lateral_by_company_df = pd.DataFrame()
 
@@ -118,9 +290,20 @@ sizeref_gas = 0
 map_metric = "Oil"
 map_min_percentile = 0
 map_metric_label = "Oil"
+map_view = None  # snapped (x_range, y_range, level) of the zoomed map
 text = ""
 selected_well = ""
 
+# Diagnostics (admin only)
+diag_token = ""
+diag_unlocked = False
+diag_stages_df = pd.DataFrame()
+diag_callbacks_df = pd.DataFrame()
+diag_cache_text = ""
+
+# Background update running for this session (busy indicator)
+busy = False
+
 # Navigation state
 active_page = "overview"
 nav_overview = "nav-button active"
@@ -132,422 +315,713 @@ nav_drilling = nav_production = nav_frac = nav_map = nav_wells = nav_data = (
 # ------------------------------------------------------------------
 # STATE UPDATE (DATA & KPIs)
 # ------------------------------------------------------------------
-def update_state(state):
-    # ---------- FILTER PRODUCTION DATA ----------
-    d1 = prod.copy()
-
-    company_filter = state.company_filter
-    field_filter = state.field_filter
-    well_type_filter = state.well_type_filter
-
-    # company filter
-    if isinstance(company_filter, list):
-        if "All" not in company_filter:
-            d1 = d1[d1["company"].isin(company_filter)]
-    elif company_filter != "All":
-        d1 = d1[d1["company"] == company_filter]
-
-    # field fIlter
-    if isinstance(field_filter, list):
-        if "All" not in field_filter:
-            d1 = d1[d1["field"].isin(field_filter)]
-    elif field_filter != "All":
-        d1 = d1[d1["field"] == field_filter]
-
-    # well type filter
-    if isinstance(well_type_filter, list):
-        if "All" not in well_type_filter:
-            d1 = d1[d1["well_type"].isin(well_type_filter)]
-    elif well_type_filter != "All":
-        d1 = d1[d1["well_type"] == well_type_filter]
-
-    # year range
-    d1 = d1[(d1["year"] >= state.year_range[0]) & (d1["year"] <= state.year_range[1])]
-    state.filtered_prod = d1
-    state.filtered_prod_view = d1.head(MAX_TABLE_ROWS)
-
-    # ---------- FILTER FRAC DATA ----------
-    d2 = frac.copy()
-
-    # company filter
-    if isinstance(company_filter, list):
-        if "All" not in company_filter:
-            d2 = d2[d2["company"].isin(company_filter)]
-    elif company_filter != "All":
-        d2 = d2[d2["company"] == company_filter]
-
-    # field filter
-    if isinstance(field_filter, list):
-        if "All" not in field_filter:
-            d2 = d2[d2["field"].isin(field_filter)]
-    elif field_filter != "All":
-        d2 = d2[d2["field"] == field_filter]
-
-    # well type filter
-    if "well_type" in d2.columns:
-        if isinstance(well_type_filter, list):
-            if "All" not in well_type_filter:
-                d2 = d2[d2["well_type"].isin(well_type_filter)]
-        elif well_type_filter != "All":
-            d2 = d2[d2["well_type"] == well_type_filter]
-
-    d2 = d2[(d2["year"] >= state.year_range[0]) & (d2["year"] <= state.year_range[1])]
-
-    # ---- Add frac intensity metrics  ----
-    if not d2.empty:
-        d2 = d2.copy()
+# Each function below is a node of the derived-data graph declared in
+# `pipeline` further down: it receives its state inputs and upstream
+# node values, and either returns an intermediate frame or a dict of
+# state variables to publish.
+def filter_prod(data, key):
+    # a RowSelection: consumers gather only the columns/rows they read
+    return select_rows(data.prod, data.filter_indexes["prod"], *key_selections(key))
+
+
+def filter_frac(data, key):
+    # intensity columns are computed once at load (core/schema.py)
+    return filter_frame(data.frac, data.filter_indexes["frac"], *key_selections(key))
+
 
-        lateral = d2["lateral_length_ft"].replace(0, pd.NA)  # avoid division by zero
-        d2["proppant_intensity_lbft"] = d2["proppant_pumped_lb"] / lateral
-        d2["fluid_intensity_bblft"] = d2["fluid_pumped_bbl"] / lateral
+def filter_drill(data, key):
+    return filter_frame(data.drill, data.filter_indexes["drill"], *key_selections(key))
 
+
+def filter_comp(data, key):
+    return filter_frame(data.comp, data.filter_indexes["comp"], *key_selections(key))
+
+
+def key_selections(key):
+    company_sel, field_sel, well_type_sel, year_lo, year_hi = key
+    selections = {
+        "company": company_sel,
+        "field": field_sel,
+        "well_type": well_type_sel,
+    }
+    return selections, (year_lo, year_hi)
+
+
+def add_cum(d2, cum):
     # ---- Add cumulative production to frac from prod ----
-    if not d1.empty and not d2.empty:
-        cum = (
-            d1.groupby("well_id", as_index=False)[["oil_prod_m3", "gas_prod_km3"]]
-            .sum()
-            .rename(
-                columns={
-                    "oil_prod_m3": "oil_cum_m3_raw",
-                    "gas_prod_km3": "gas_cum_km3_raw",
-                }
-            )
-        )
-        cum["oil_cum_km3"] = cum["oil_cum_m3_raw"] / 1_000_000.0  # m³ -> ~Mm³
-        cum["gas_cum_Mm3"] = cum["gas_cum_km3_raw"] / 1_000.0  # km³ -> ~Mm³
+    if cum.empty or d2.empty:
+        return d2
+
+    cum = cum.rename(
+        columns={
+            "oil_prod_m3": "oil_cum_m3_raw",
+            "gas_prod_km3": "gas_cum_km3_raw",
+        }
+    )
+    cum["oil_cum_km3"] = cum["oil_cum_m3_raw"] / 1_000_000.0  # m³ -> ~Mm³
+    cum["gas_cum_Mm3"] = cum["gas_cum_km3_raw"] / 1_000.0  # km³ -> ~Mm³
 
-        d2 = d2.merge(
-            cum[["well_id", "oil_cum_km3", "gas_cum_Mm3"]],
-            on="well_id",
-            how="left",
-        )
+    return d2.merge(
+        cum[["well_id", "oil_cum_km3", "gas_cum_Mm3"]],
+        on="well_id",
+        how="left",
+    )
+
+
+def enrich_frac(data, key, d2):
+    # per-well prefix sums: O(wells), the monthly rows are never grouped
+    return add_cum(d2, data.cum_index.cumulative(*key_selections(key)))
+
+
+def table_page(prefix, number, column, descending, pager):
+    view, number = pager.page(number, TABLE_PAGE_SIZE, column, descending)
+    page_count = pager.page_count(TABLE_PAGE_SIZE)
+    return {
+        f"filtered_{prefix}_view": view,
+        f"{prefix}_page_count": page_count,
+        f"{prefix}_page_label": page_label(number, page_count, pager.n_rows),
+    }
+
+
+def prod_page_view(number, column, descending, pager):
+    return table_page("prod", number, column, descending, pager)
+
+
+def frac_page_view(number, column, descending, pager):
+    return table_page("frac", number, column, descending, pager)
 
-    state.filtered_frac = d2
-    state.filtered_frac_view = d2.head(MAX_TABLE_ROWS)
+
+def frac_tables(d2):
+    out = {}
 
     # --- Avg lateral length by company precomputed ---
     if not d2.empty:
-        state.avg_lateral_by_company_df = (
-            d2.groupby("company", as_index=False)["lateral_length_ft"]
+        out["avg_lateral_by_company_df"] = (
+            d2.groupby("company", as_index=False, observed=True)["lateral_length_ft"]
             .mean()
             .sort_values("lateral_length_ft", ascending=False)
         )
     else:
-        state.avg_lateral_by_company_df = d2.head(0)
+        out["avg_lateral_by_company_df"] = d2.head(0)
 
     # sample for heavy scatters
     if len(d2) > FRAC_SAMPLE_N:
-        state.filtered_frac_sample = d2.sample(FRAC_SAMPLE_N, random_state=0)
+        out["filtered_frac_sample"] = d2.sample(FRAC_SAMPLE_N, random_state=0)
     else:
-        state.filtered_frac_sample = d2
+        out["filtered_frac_sample"] = d2
+
+    return out
 
-    # ---------- FILTER DRILL DATA ----------
-    d3 = drill.copy()
 
-    # company filter
-    if isinstance(company_filter, list):
-        if "All" not in company_filter:
-            d3 = d3[d3["company"].isin(company_filter)]
-    elif company_filter != "All":
-        d3 = d3[d3["company"] == company_filter]
+def frac_kpis(d2):
+    # ---------- KPIs: frac ----------
+    if d2.empty:
+        return {
+            "n_frac_wells": 0,
+            "avg_lateral_length": 0.0,
+            "avg_stages": 0.0,
+            "total_proppant": 0.0,
+            "total_fluid": 0.0,
+            "avg_proppant_intensity": 0.0,
+            "avg_fluid_intensity": 0.0,
+            "avg_lateral": 0.0,
+        }
+    return {
+        "n_frac_wells": d2["well_id"].nunique(),
+        "avg_lateral_length": round(float(d2["lateral_length_ft"].mean()), 0),
+        "avg_stages": round(float(d2["number_stages"].mean()), 1),
+        "total_proppant": round(float(d2["proppant_pumped_lb"].sum()) / 1_000_000, 2),
+        "total_fluid": round(float(d2["fluid_pumped_bbl"].sum()) / 1_000_100, 2),
+        # intensity KPIs
+        "avg_proppant_intensity": (
+            round(float(d2["proppant_intensity_lbft"].dropna().mean()), 1)
+            if "proppant_intensity_lbft" in d2.columns
+            else 0.0
+        ),
+        "avg_fluid_intensity": (
+            round(float(d2["fluid_intensity_bblft"].dropna().mean()), 2)
+            if "fluid_intensity_bblft" in d2.columns
+            else 0.0
+        ),
+        "avg_lateral": round(float(d2["lateral_length_ft"].mean()), 2),
+    }
 
-    # field filter
-    if isinstance(field_filter, list):
-        if "All" not in field_filter:
-            d3 = d3[d3["field"].isin(field_filter)]
-    elif field_filter != "All":
-        d3 = d3[d3["field"] == field_filter]
 
-    # year range
-    d3 = d3[(d3["year"] >= state.year_range[0]) & (d3["year"] <= state.year_range[1])]
-    state.filtered_drill = d3
+def drill_charts(d3):
+    out = {}
 
     # Precompute drilling groupbys
     if not d3.empty:
-        state.drill_wells_by_year_df = d3.groupby("year", as_index=False)["wells"].sum()
-        state.drill_meters_by_year_df = d3.groupby("year", as_index=False)[
+        out["drill_wells_by_year_df"] = d3.groupby("year", as_index=False)["wells"].sum()
+        out["drill_meters_by_year_df"] = d3.groupby("year", as_index=False)[
             "meters"
         ].sum()
-        state.drill_meters_by_company_df = (
-            d3.groupby("company", as_index=False)["meters"]
+        out["drill_meters_by_company_df"] = (
+            d3.groupby("company", as_index=False, observed=True)["meters"]
             .sum()
             .sort_values("meters", ascending=False)
         )
     else:
-        state.drill_wells_by_year_df = d3.head(0)
-        state.drill_meters_by_year_df = d3.head(0)
-        state.drill_meters_by_company_df = d3.head(0)
+        out["drill_wells_by_year_df"] = d3.head(0)
+        out["drill_meters_by_year_df"] = d3.head(0)
+        out["drill_meters_by_company_df"] = d3.head(0)
 
-    # ---------- FILTER COMPLETION DATA ----------
-    d4 = comp.copy()
+    return out
 
-    # Company filter
-    if isinstance(state.company_filter, list):
-        if "All" not in state.company_filter:
-            d4 = d4[d4["company"].isin(state.company_filter)]
-    elif state.company_filter != "All":
-        d4 = d4[d4["company"] == state.company_filter]
 
-    # Field filter
-    if isinstance(state.field_filter, list):
-        if "All" not in state.field_filter:
-            d4 = d4[d4["field"].isin(state.field_filter)]
-    elif state.field_filter != "All":
-        d4 = d4[d4["field"] == state.field_filter]
+def drill_kpis(d3):
+    # ---------- KPIs: drilling ----------
+    if d3.empty:
+        return {"drilled_wells": 0, "drilled_meters": 0.0}
+    return {
+        "drilled_wells": int(d3["wells"].sum()),
+        "drilled_meters": round(float(d3["meters"].sum()), 2),
+    }
 
-    # Year filter
-    d4 = d4[(d4["year"] >= state.year_range[0]) & (d4["year"] <= state.year_range[1])]
 
-    state.filtered_comp = d4
+def comp_charts(d4):
+    out = {}
 
     # Precompute completion groupbys
     if not d4.empty:
         if "completion" in d4.columns:
-            state.comp_by_year_df = (
+            out["comp_by_year_df"] = (
                 d4.groupby("year", as_index=False)["completion"]
                 .sum()
                 .rename(columns={"completion": "completions"})
             )
-            state.comp_by_company_df = (
-                d4.groupby("company", as_index=False)["completion"]
+            out["comp_by_company_df"] = (
+                d4.groupby("company", as_index=False, observed=True)["completion"]
                 .sum()
                 .rename(columns={"completion": "completions"})
                 .sort_values("completions", ascending=False)
             )
         else:
             # fallback to counting rows if completion column missing
-            state.comp_by_year_df = (
+            out["comp_by_year_df"] = (
                 d4.groupby("year", as_index=False)
                 .size()
                 .rename(columns={"size": "completions"})
             )
-            state.comp_by_company_df = (
-                d4.groupby("company", as_index=False)
+            out["comp_by_company_df"] = (
+                d4.groupby("company", as_index=False, observed=True)
                 .size()
                 .rename(columns={"size": "completions"})
             )
     else:
-        state.comp_by_year_df = d4.head(0)
-        state.comp_by_company_df = d4.head(0)
+        out["comp_by_year_df"] = d4.head(0)
+        out["comp_by_company_df"] = d4.head(0)
+
+    return out
+
+
+def prod_cells(data, key):
+    return data.production_cube.select(*key_selections(key))
+
+
+def prod_kpis(cells):
+    # ---------- KPIs: production (from the cube) ----------
+    if cells.empty:
+        return {
+            "n_wells": 0,
+            "total_oil": 0.0,
+            "total_gas": 0.0,
+            "total_water": 0.0,
+            "avg_depth": 0.0,
+        }
+    totals = cells.totals()
+    return {
+        "n_wells": totals["n_wells"],
+        "total_oil": round(totals["oil_prod_m3"] / 1_000_000, 2),
+        "total_gas": round(totals["gas_prod_km3"] / 1_000, 2),
+        "total_water": round(totals["water_prod_m3"] / 1_000_000, 2),
+        "avg_depth": round(totals["avg_depth"], 2),
+    }
 
-    # ---------- KPIs: drilling ----------
-    if not d3.empty:
-        state.drilled_wells = int(d3["wells"].sum())
-        state.drilled_meters = round(float(d3["meters"].sum()), 2)
-    else:
-        state.drilled_wells = 0
-        state.drilled_meters = 0.0
 
-    # ---------- LATEST RECORD PER WELL (for KPIs & map) ----------
-    latest = d1 if not d1.empty else d1.head(0)
+def wells_by_type(cells):
+    # ---------- WELLS BY TYPE ----------
+    return {"wells_by_type_df": cells.wells_by_type()}
 
-    # ---------- KPIs: production ----------
-    state.n_wells = latest["well_id"].nunique() if not latest.empty else 0
-    state.total_oil = (
-        round(latest["oil_prod_m3"].sum() / 1_000_000, 2) if not latest.empty else 0.0
-    )
-    state.total_gas = (
-        round(latest["gas_prod_km3"].sum() / 1_000, 2) if not latest.empty else 0.0
-    )
-    state.total_water = (
-        round(latest["water_prod_m3"].sum() / 1_000_000, 2) if not latest.empty else 0.0
-    )
 
-    # ---------- WELLS BY TYPE ----------
-    if not latest.empty:
-        state.wells_by_type_df = (
-            latest.groupby("well_type", as_index=False)["well_id"]
-            .nunique()
-            .rename(columns={"well_id": "n_wells"})
-            .sort_values("n_wells", ascending=False)
-        )
-    else:
-        state.wells_by_type_df = latest.head(0)
+def depth_hist(cells):
+    # ---------- DEPTH HISTOGRAM (one depth per well) ----------
+    return {"depth_hist_df": histogram_frame(cells.well_depths(), DEPTH_HIST_BINS)}
 
-    # ---------- DEPTH BY WELL TYPE ----------
-    if not latest.empty:
-        state.depth_by_type_df = (
-            latest.groupby("well_type", as_index=False)["depth"]
-            .mean()
-            .rename(columns={"depth": "avg_depth"})
-            .sort_values("avg_depth", ascending=False)
-        )
-    else:
-        state.depth_by_type_df = latest.head(0)
-
-    # ---------- TOP OIL WELLS ----------
-    state.top_oil_wells_df = (
-        (
-            latest[["well_name", "oil_cum_m3"]]
-            .dropna()
-            .groupby("well_name", as_index=False)["oil_cum_m3"]
-            .max()
-            .sort_values("oil_cum_m3", ascending=False)
-            .head(20)
-        )
-        if not latest.empty
-        else latest.head(0)
-    )
 
-    # ---------- TOP GAS WELLS ----------
-    state.top_gas_wells_df = (
-        (
-            latest[["well_name", "gas_cum_km3"]]
-            .dropna()
-            .groupby("well_name", as_index=False)["gas_cum_km3"]
-            .max()
-            .sort_values("gas_cum_km3", ascending=False)
-            .head(20)
-        )
-        if not latest.empty
-        else latest.head(0)
-    )
+def lateral_hist(d2):
+    # ---------- LATERAL LENGTH HISTOGRAM ----------
+    return {
+        "lateral_hist_df": histogram_frame(d2["lateral_length_ft"], LATERAL_HIST_BINS)
+    }
 
-    # ---------- PRODUCTION OVER TIME ----------
-    if not d1.empty:
-        state.prod_time_df = (
-            d1.groupby("date", as_index=False)[
-                ["oil_prod_m3", "gas_prod_km3", "water_prod_m3"]
-            ]
-            .sum()
-            .sort_values("date")
-        )
-    else:
-        state.prod_time_df = d1.head(0)
 
-    # ---------- MAP DATA ----------
-    if not latest.empty:
-        latest2 = latest.copy()
+def depth_by_type(cells):
+    # ---------- DEPTH BY WELL TYPE (row-weighted, from the cube) ----------
+    return {"depth_by_type_df": cells.depth_by_type()}
 
-        # basic stats
-        state.max_oil = latest2["oil_cum_m3"].max()
-        state.max_gas = latest2["gas_cum_km3"].max()
-
-        # bubble sizes for OIL (95% quantile scaling)
-        oil = latest2["oil_cum_m3"].fillna(0)
-        q95_oil = oil.quantile(0.95)
-        if q95_oil <= 0:
-            q95_oil = 1.0
-        latest2["oil_size"] = 4 + 36 * oil.clip(upper=q95_oil) / q95_oil
-
-        # bubble sizes for GAS
-        gas = latest2["gas_cum_km3"].fillna(0)
-        q95_gas = gas.quantile(0.95)
-        if q95_gas <= 0:
-            q95_gas = 1.0
-        latest2["gas_size"] = 4 + 36 * gas.clip(upper=q95_gas) / q95_gas
-
-        # Map toggle
-        metric = getattr(state, "map_metric", "Oil")
-        p = getattr(state, "map_min_percentile", 0)
-
-        if metric == "Oil":
-            metric_series = oil
-            size_col = "oil_size"
-            metric_label = "Oil (m³)"
-            fill_color = "rgba(0,160,0,0.55)"
-            border_color = "darkgreen"
-        else:
-            metric_series = gas
-            size_col = "gas_size"
-            metric_label = "Gas (km³)"
-            fill_color = "rgba(220,0,0,0.55)"
-            border_color = "darkred"
-
-        cutoff = metric_series.quantile(p / 100.0) if 0 <= p <= 100 else 0
-        map_latest = latest2[metric_series >= cutoff].copy()
-
-        map_latest["map_size"] = map_latest[size_col]
-        map_latest["map_metric_value"] = metric_series.loc[map_latest.index]
-        map_latest["map_color"] = fill_color
-        map_latest["map_border_color"] = border_color
-
-        map_latest["hover_text"] = (
-            "Well: "
-            + map_latest["well_name"].astype(str)
-            + "<br>Company: "
-            + map_latest["company"].astype(str)
-            + "<br>Field: "
-            + map_latest["field"].astype(str)
-            + "<br>"
+
+def top_wells(data, key):
+    # per-well peaks from the leaderboard: no grouping of the filtered rows
+    selections, year_range = key_selections(key)
+    return {
+        # ---------- TOP OIL WELLS ----------
+        "top_oil_wells_df": data.well_leaderboard.top(
+            "oil_cum_m3", selections, year_range, TOP_WELLS_N
+        ),
+        # ---------- TOP GAS WELLS ----------
+        "top_gas_wells_df": data.well_leaderboard.top(
+            "gas_cum_km3", selections, year_range, TOP_WELLS_N
+        ),
+    }
+
+
+def prod_time(cells):
+    # ---------- PRODUCTION OVER TIME ----------
+    return {"prod_time_df": cells.time_series()}
+
+
+MAP_COLUMNS = [
+    "well_id",
+    "well_name",
+    "Xcoor",
+    "Ycoor",
+    "oil_cum_m3",
+    "gas_cum_km3",
+]
+
+
+def map_base(data, key):
+    # ---------- MAP BASE (latest record per well, metric independent) ----------
+    # one stored row per well, found through the prefix-sum segments: the
+    # monthly rows of the selection are never scanned
+    rows, segments = data.cum_index.latest_segments(*key_selections(key))
+    wells = RowSelection(data.prod, rows).frame(MAP_COLUMNS)
+    if wells.empty:
+        return wells
+
+    # everything that depends on the well (or its segment: company/field
+    # as of that row) is gathered from the presentation table built at load
+    presentation = data.well_presentation
+    at = presentation.positions(wells["well_id"])
+    wells["hover_well"] = presentation.hover[segments]
+    wells["grid_key"] = presentation.grid_keys[at]  # quadtree position
+    for m in MAP_METRICS.values():
+        wells[m["size"]] = presentation.sizes(m["column"], wells[m["column"]])
+    return wells
+
+
+def map_outputs(metric, p, view, data, base):
+    # ---------- MAP DATA ----------
+    if base.empty:
+        return {
+            "max_oil": 0,
+            "max_gas": 0,
+            "map_metric_label": "",
+            "map_df": base,
+        }
+
+    # Map toggle (the marker colors are in each metric's chart)
+    m = MAP_METRICS.get(metric) or MAP_METRICS["Oil"]
+    metric_col, metric_label = m["column"], m["label"]
+    p = p or 0
+
+    metric_series = base[metric_col].fillna(0)
+    cutoff = metric_series.quantile(p / 100.0) if 0 <= p <= 100 else 0
+    shown = base[metric_series >= cutoff]
+
+    # individual wells when zoomed in enough, quadtree clusters otherwise
+    markers, clustered = level_of_detail(data.well_grid, shown, view, MAP_MAX_MARKERS)
+    markers = markers.copy()
+    values = markers[metric_col].astype("float64").fillna(0).round(1).astype(str)
+
+    if clustered:
+        markers["map_size"] = bubble_sizes(markers[metric_col])
+        markers["well_name"] = ""
+        markers["hover_text"] = (
+            "Cluster: "
+            + markers["n_wells"].astype(str)
+            + " wells<br>"
             + metric_label
-            + ": "
-            + map_latest["map_metric_value"].round(1).astype(str)
+            + " (sum): "
+            + values
         )
+    else:
+        markers["map_size"] = markers[m["size"]]
+        markers["n_wells"] = 1
+        markers["hover_text"] = markers["hover_well"] + metric_label + ": " + values
 
-        state.map_metric_label = metric_label
-        state.map_df = map_latest[
+    return {
+        # basic stats
+        "max_oil": base["oil_cum_m3"].max(),
+        "max_gas": base["gas_cum_km3"].max(),
+        "map_metric_label": metric_label,
+        "map_df": markers[
             [
-                "well_id",
                 "well_name",
                 "Xcoor",
                 "Ycoor",
                 "oil_cum_m3",
                 "gas_cum_km3",
+                "n_wells",
                 "map_size",
-                "map_color",
-                "map_border_color",
                 "hover_text",
             ]
-        ]
-    else:
-        state.max_oil = 0
-        state.max_gas = 0
-        state.map_metric_label = ""
-        state.map_df = latest.head(0)
+        ],
+    }
 
-    # ---------- KPIs: frac ----------
-    if not d2.empty:
-        state.n_frac_wells = d2["well_id"].nunique()
-        state.avg_lateral_length = round(d2["lateral_length_ft"].mean(), 0)
-        state.avg_stages = round(d2["number_stages"].mean(), 1)
-        state.total_proppant = round(d2["proppant_pumped_lb"].sum() / 1_000_000, 2)
-        state.total_fluid = round(d2["fluid_pumped_bbl"].sum() / 1_000_100, 2)
 
-        # intensity KPIs
-        state.avg_proppant_intensity = (
-            round(d2["proppant_intensity_lbft"].dropna().mean(), 1)
-            if "proppant_intensity_lbft" in d2.columns
-            else 0.0
-        )
+def selected_well_outputs(well, data, key):
+    # ---------- Selected well data (per-well row blocks) ----------
+    selections, year_range = key_selections(key)
+    d1 = filter_rows(data.prod_wells.history(data.prod, well), selections, year_range)
+    d2 = filter_rows(data.frac_wells.history(data.frac, well), selections, year_range)
+    return {
+        "selected_prod_df": d1,
+        "selected_frac_df": add_cum(
+            d2,
+            d1.groupby("well_id", as_index=False)[["oil_prod_m3", "gas_prod_km3"]].sum(),
+        ),
+    }
 
-        state.avg_fluid_intensity = (
-            round(d2["fluid_intensity_bblft"].dropna().mean(), 2)
-            if "fluid_intensity_bblft" in d2.columns
-            else 0.0
-        )
-    else:
-        state.n_frac_wells = 0
-        state.avg_lateral_length = 0.0
-        state.avg_stages = 0.0
-        state.total_proppant = 0.0
-        state.total_fluid = 0.0
-        state.avg_proppant_intensity = 0.0
-        state.avg_fluid_intensity = 0.0
-
-    if not state.filtered_prod.empty:
-        state.avg_depth = round(state.filtered_prod["depth"].mean(), 2)
-    else:
-        state.avg_depth = 0.0
 
-    if not state.filtered_frac.empty:
-        state.avg_lateral = round(
-            state.filtered_frac["lateral_length_ft"].mean(), 2
-        )
-    else:
-        state.avg_lateral = 0.0
-
-    # ---------- Selected well data ----------
-    if state.selected_well:
-        state.selected_prod_df = state.filtered_prod[
-            state.filtered_prod["well_name"] == state.selected_well
-        ]
-        state.selected_frac_df = state.filtered_frac[
-            state.filtered_frac["well_name"] == state.selected_well
-        ]
-    else:
-        state.selected_prod_df = state.filtered_prod.head(0)
-        state.selected_frac_df = state.filtered_frac.head(0)
+FILTER_VARS = ("company_filter", "field_filter", "well_type_filter", "year_range")
+
+# slider/multi-select inputs that fire in bursts (see schedule_update)
+DEBOUNCED_VARS = FILTER_VARS + ("map_min_percentile",)
+
+pipeline = Pipeline(
+    [
+        Node("filters", filter_key, inputs=FILTER_VARS, key=True),
+        # inputs of the KPIs; nodes run (and publish) in declaration order,
+        # so the KPIs reach the page before any heavier frame
+        Node("prod_cells", prod_cells, deps=["data", "filters"]),
+        Node("frac_filtered", filter_frac, deps=["data", "filters"]),
+        Node("drill_rows", filter_drill, deps=["data", "filters"]),
+        # KPIs (overview, always published)
+        Node(
+            "prod_kpis",
+            prod_kpis,
+            deps=["prod_cells"],
+            outputs=["n_wells", "total_oil", "total_gas", "total_water", "avg_depth"],
+        ),
+        Node(
+            "frac_kpis",
+            frac_kpis,
+            deps=["frac_filtered"],
+            outputs=[
+                "n_frac_wells",
+                "avg_lateral_length",
+                "avg_stages",
+                "total_proppant",
+                "total_fluid",
+                "avg_proppant_intensity",
+                "avg_fluid_intensity",
+                "avg_lateral",
+            ],
+        ),
+        Node(
+            "drill_kpis",
+            drill_kpis,
+            deps=["drill_rows"],
+            outputs=["drilled_wells", "drilled_meters"],
+        ),
+        # base filtered frames
+        Node("prod_rows", filter_prod, deps=["data", "filters"]),
+        Node("comp_rows", filter_comp, deps=["data", "filters"]),
+        Node("frac_rows", enrich_frac, deps=["data", "filters", "frac_filtered"]),
+        Node("map_base", map_base, deps=["data", "filters"]),
+        # page-bound frames
+        Node("prod_pager", TablePager, deps=["prod_rows"]),
+        Node("frac_pager", TablePager, deps=["frac_rows"]),
+        Node(
+            "prod_page",
+            prod_page_view,
+            inputs=["prod_page_number", "prod_sort", "prod_sort_desc"],
+            deps=["prod_pager"],
+            outputs=["filtered_prod_view", "prod_page_count", "prod_page_label"],
+            pages=["data"],
+        ),
+        Node(
+            "frac_page",
+            frac_page_view,
+            inputs=["frac_page_number", "frac_sort", "frac_sort_desc"],
+            deps=["frac_pager"],
+            outputs=["filtered_frac_view", "frac_page_count", "frac_page_label"],
+            pages=["data"],
+        ),
+        Node(
+            "frac_tables",
+            frac_tables,
+            deps=["frac_rows"],
+            outputs=["avg_lateral_by_company_df", "filtered_frac_sample"],
+            pages=["drilling", "frac", "data"],
+        ),
+        Node(
+            "drill_charts",
+            drill_charts,
+            deps=["drill_rows"],
+            outputs=[
+                "drill_wells_by_year_df",
+                "drill_meters_by_year_df",
+                "drill_meters_by_company_df",
+            ],
+            pages=["drilling"],
+        ),
+        Node(
+            "comp_charts",
+            comp_charts,
+            deps=["comp_rows"],
+            outputs=["comp_by_year_df", "comp_by_company_df"],
+            pages=["drilling"],
+        ),
+        Node(
+            "depth_hist",
+            depth_hist,
+            deps=["prod_cells"],
+            outputs=["depth_hist_df"],
+            pages=["geology", "drilling"],
+        ),
+        Node(
+            "lateral_hist",
+            lateral_hist,
+            deps=["frac_filtered"],
+            outputs=["lateral_hist_df"],
+            pages=["drilling"],
+        ),
+        Node(
+            "depth_by_type",
+            depth_by_type,
+            deps=["prod_cells"],
+            outputs=["depth_by_type_df"],
+            pages=["geology"],
+        ),
+        Node(
+            "wells_by_type",
+            wells_by_type,
+            deps=["prod_cells"],
+            outputs=["wells_by_type_df"],
+            pages=["production"],
+        ),
+        Node(
+            "top_wells",
+            top_wells,
+            deps=["data", "filters"],
+            outputs=["top_oil_wells_df", "top_gas_wells_df"],
+            pages=["production"],
+        ),
+        Node(
+            "prod_time",
+            prod_time,
+            deps=["prod_cells"],
+            outputs=["prod_time_df"],
+            pages=["production"],
+        ),
+        Node(
+            "map",
+            map_outputs,
+            inputs=["map_metric", "map_min_percentile", "map_view"],
+            deps=["data", "map_base"],
+            outputs=["max_oil", "max_gas", "map_metric_label", "map_df"],
+            pages=["map"],
+        ),
+        Node(
+            "selected_well",
+            selected_well_outputs,
+            inputs=["selected_well"],
+            deps=["data", "filters"],
+            outputs=["selected_prod_df", "selected_frac_df"],
+            pages=["wells"],
+        ),
+    ],
+    cache=result_cache,
+    metrics=metrics,
+    max_workers=PIPELINE_WORKERS,
+    data=_data,
+)
+
+
+# pages that bind lazily computed frames
+pipeline_pages = {
+    page for node in pipeline.nodes.values() for page in node.pages or ()
+}
+
+
+def update_state(
+    state, reason="", all_pages=False, stats=None, should_stop=None
+):
+    """Publish the derived data bound by the active page (or every page).
+
+    In a live session the pipeline runs in a background thread (Taipy long
+    callback) and pushes each node's outputs as soon as it completes: the
+    KPIs first, then the heavier frames. A newer update for the session
+    supersedes one still running. Stand-in states (benchmarks) run inline
+    and stop between nodes once ``should_stop()`` is true.
+    """
+    page = None if all_pages else getattr(state, "active_page", "overview")
+    if not isinstance(state, State):
+        pipeline.run(state, reason, page, stats, should_stop)
+        return
+
+    job = pipeline.prepare(state, reason, page)
+    state.busy = True
+    invoke_long_callback(
+        state,
+        run_update_job,
+        (state.get_gui(), get_state_id(state), job),
+        update_job_done,
+        (job,),
+    )
+
+
+def run_update_job(gui, state_id, job):
+    # worker thread: no `state` here, outputs go through invoke_callback
+    def publish(outputs):
+        invoke_callback(gui, state_id, publish_outputs, (outputs,))
+
+    with metrics.measure("callback", "background_update"):
+        pipeline.execute(job, publish)
+
+
+def publish_outputs(state, outputs):
+    for var, value in outputs.items():
+        setattr(state, var, value)
+
+
+def update_job_done(state, status, job, result=None):
+    # superseded jobs leave the indicator to the run that replaced them
+    if pipeline.is_current(job):
+        state.busy = False
+
+
+def schedule_update(state, reason):
+    """Debounced update_state: bursts of filter changes start one run.
+
+    The update is started from a timer thread through invoke_callback.
+    A newer filter change supersedes it through pipeline.prepare, which
+    stops the older run between nodes.
+    Outside a live Taipy session (benchmarks) it runs synchronously.
+    """
+    if DEBOUNCE_S <= 0 or not isinstance(state, State):
+        update_state(state, reason)
+        return
+    gui, state_id = state.get_gui(), get_state_id(state)
+
+    def run(is_stale):
+        # not forwarded: the debouncer forgets an idle session once this
+        # returns, so is_stale() turns true before the background job runs
+        invoke_callback(gui, state_id, update_state, (reason,))
+
+    debouncer.submit(state_id, run)
+
+
+# ------------------------------------------------------------------
+# HOT DATA RELOAD
+# ------------------------------------------------------------------
+# Session variables that follow the data (bound as "{company_lov}" etc.)
+DATA_VARS = (
+    "company_lov",
+    "field_lov",
+    "well_type_lov",
+    "well_lov",
+    "year_min",
+    "year_max",
+    "prod_sort_lov",
+    "frac_sort_lov",
+)
+
+
+def reload_data(gui=None):
+    """Load the changed data files and swap them in for every session.
+
+    Runs on the data watcher's thread. The new datasets are loaded,
+    validated and indexed while the old ones keep serving; an invalid
+    file raises before anything is replaced. Connected sessions are then
+    re-synced and recomputed through ``gui.broadcast_callback``.
+
+    The swap is one assignment of ``_data`` (and the pipeline's copy of
+    it): code holding the previous snapshot keeps a consistent one.
+    """
+    global _data
+    data = build_data(load_datasets(DATA_PATHS), _data.version + 1)
+    pipeline.set_data(data)
+    _data = data
+    logging.info(
+        "Data reloaded (version %d): %s",
+        data.version,
+        {name: len(df) for name, df in data.datasets.items()},
+    )
+    if gui is not None:
+        gui.broadcast_callback(refresh_session)
+
+
+def reload_on_signal(gui):
+    """Reload when SIGHUP arrives (sent by serve.py's watching parent)."""
+
+    def reload():
+        try:
+            reload_data(gui)
+        except Exception:
+            logging.exception("Data reload failed; still serving the previous data")
+
+    def handler(signum, frame):
+        # off the signal handler: loading and indexing take a while
+        threading.Thread(target=reload, name="data-reload", daemon=True).start()
+
+    signal.signal(signal.SIGHUP, handler)
+
+
+def kept_selection(value, lov):
+    # selections that vanished from the data fall back to "All"
+    allowed = set(lov)
+    if isinstance(value, (list, tuple)):
+        kept = [v for v in value if v in allowed]
+        return kept if kept else "All"
+    return value if value in allowed else "All"
+
+
+def sync_data(state):
+    """Move a session's LOV's and filters onto the current data.
+
+    Returns False when the session is already on it.
+    """
+    data = _data
+    if state.data_version == data.version:
+        return False
+
+    # a range that reached the old last year follows the data forward
+    lo, hi = state.year_range
+    if hi >= state.year_max:
+        hi = data.year_max
+    lo = max(data.year_min, min(lo, data.year_max))
+    hi = max(data.year_min, min(hi, data.year_max))
+
+    for var in DATA_VARS:
+        setattr(state, var, getattr(data, var))
+    for var, lov in (
+        ("company_filter", data.company_lov),
+        ("field_filter", data.field_lov),
+        ("well_type_filter", data.well_type_lov),
+    ):
+        value = getattr(state, var)
+        kept = kept_selection(value, lov)
+        if kept != value:
+            setattr(state, var, kept)
+    if [lo, hi] != list(state.year_range):
+        state.year_range = [lo, hi]
+    if state.selected_well and state.selected_well not in data.prod_wells.offsets:
+        state.selected_well = ""
+    if state.prod_sort not in data.prod_sort_lov:
+        state.prod_sort = data.prod_sort_lov[0]
+    if state.frac_sort not in data.frac_sort_lov:
+        state.frac_sort = data.frac_sort_lov[0]
+    state.data_version = data.version
+    return True
+
+
+def refresh_session(state):
+    if sync_data(state):
+        update_state(state, "reload")
 
 
 # ------------------------------------------------------------------
@@ -574,6 +1048,11 @@ def update_nav(state):
 # CALLBACKS
 # ------------------------------------------------------------------
 def on_change(state, var_name, var_value):
+    with metrics.measure("callback", "on_change"):
+        handle_change(state, var_name)
+
+
+def handle_change(state, var_name):
     if var_name in [
         "company_filter",
         "field_filter",
@@ -582,8 +1061,19 @@ def on_change(state, var_name, var_value):
         "map_metric",
         "map_min_percentile",
         "selected_well",
+        "prod_sort",
+        "prod_sort_desc",
+        "frac_sort",
+        "frac_sort_desc",
     ]:
-        update_state(state)
+        if var_name in FILTER_VARS:
+            # a new row set starts browsing from its first page
+            state.prod_page_number = 1
+            state.frac_page_number = 1
+        if var_name in DEBOUNCED_VARS:
+            schedule_update(state, var_name)
+        else:
+            update_state(state, var_name)
 
 
 def on_init(state):
@@ -591,73 +1081,210 @@ def on_init(state):
         state.active_page = "/"
     if not hasattr(state, "map_metric") or not state.map_metric:
         state.map_metric = "Oil"
-    update_state(state)
+    with metrics.measure("callback", "on_init"):
+        # sessions start from the values bound at launch: catch up on reloads
+        sync_data(state)
+        update_state(state, "init")
     update_nav(state)
 
 
+def on_navigate(state, page_name):
+    # direct URL loads bypass the sidebar buttons: compute that page lazily
+    if page_name in pipeline_pages and page_name != state.active_page:
+        state.active_page = page_name
+        update_nav(state)
+        with metrics.measure("callback", "on_navigate"):
+            update_state(state, "navigation")
+    return page_name
+
+
+def on_map_range(state, id, payload):
+    # plotly relayout: explicit axis ranges on zoom/pan, autorange on reset
+    try:
+        x_range = (payload["xaxis.range[0]"], payload["xaxis.range[1]"])
+        y_range = (payload["yaxis.range[0]"], payload["yaxis.range[1]"])
+    except KeyError:
+        if not (payload.get("xaxis.autorange") or payload.get("autosize")):
+            return
+        view = None
+    else:
+        view = _data.well_grid.snap_view(x_range, y_range)
+    with metrics.measure("callback", "on_map_range"):
+        state.map_view = view
+        update_state(state, "map_view")
+
+
 # Navigation actions
 def go_overview(state):
     state.active_page = "/"
     update_nav(state)
+    update_state(state, "navigation")
     navigate(state, to="/")
 
 
 def go_geology(state):
     state.active_page = "geology"
     update_nav(state)
+    update_state(state, "navigation")
     navigate(state, to="geology")
 
 
 def go_drilling(state):
     state.active_page = "drilling"
     update_nav(state)
+    update_state(state, "navigation")
     navigate(state, to="drilling")
 
 
 def go_production(state):
     state.active_page = "production"
     update_nav(state)
+    update_state(state, "navigation")
     navigate(state, to="production")
 
 
 def go_frac(state):
     state.active_page = "frac"
     update_nav(state)
+    update_state(state, "navigation")
     navigate(state, to="frac")
 
 
 def go_map(state):
     state.active_page = "map"
     update_nav(state)
+    update_state(state, "navigation")
     navigate(state, to="map")
 
 
 def go_wells(state):
     state.active_page = "wells"
     update_nav(state)
+    update_state(state, "navigation")
     navigate(state, to="wells")
 
 
 def go_data(state):
     state.active_page = "data"
     update_nav(state)
+    update_state(state, "navigation")
     navigate(state, to="data")
 
 
 def go_links(state):
     state.active_page = "links"
     update_nav(state)
+    update_state(state, "navigation")
     navigate(state, to="links")
 
 
 def go_about(state):
     state.active_page = "about"
     update_nav(state)
+    update_state(state, "navigation")
     navigate(state, to="about")
 
 
+# ------------------------------------------------------------------
+# DATA EXPLORER PAGING
+# ------------------------------------------------------------------
+def turn_page(state, prefix, step):
+    page_var, count_var = f"{prefix}_page_number", f"{prefix}_page_count"
+    number = min(max(1, getattr(state, page_var) + step), getattr(state, count_var))
+    if number != getattr(state, page_var):
+        setattr(state, page_var, number)
+        update_state(state, page_var)
+
+
+def prod_first_page(state):
+    turn_page(state, "prod", -state.prod_page_count)
+
+
+def prod_prev_page(state):
+    turn_page(state, "prod", -1)
+
+
+def prod_next_page(state):
+    turn_page(state, "prod", 1)
+
+
+def prod_last_page(state):
+    turn_page(state, "prod", state.prod_page_count)
+
+
+def frac_first_page(state):
+    turn_page(state, "frac", -state.frac_page_count)
+
+
+def frac_prev_page(state):
+    turn_page(state, "frac", -1)
+
+
+def frac_next_page(state):
+    turn_page(state, "frac", 1)
+
+
+def frac_last_page(state):
+    turn_page(state, "frac", state.frac_page_count)
+
+
+PAGE_ACTIONS = {
+    "prod": (prod_first_page, prod_prev_page, prod_next_page, prod_last_page),
+    "frac": (frac_first_page, frac_prev_page, frac_next_page, frac_last_page),
+}
+
+
+def table_controls(prefix):
+    first, prev, next_, last = PAGE_ACTIONS[prefix]
+    with tgb.layout(columns="2 1 1 1 1 1 2"):
+        tgb.selector(
+            label="Sort by",
+            value=f"{{{prefix}_sort}}",
+            lov=f"{{{prefix}_sort_lov}}",
+            dropdown=True,
+            on_change=on_change,
+        )
+        tgb.toggle(
+            value=f"{{{prefix}_sort_desc}}",
+            label="Descending",
+            on_change=on_change,
+        )
+        tgb.button("⏮", on_action=first)
+        tgb.button("◀", on_action=prev)
+        tgb.button("▶", on_action=next_)
+        tgb.button("⏭", on_action=last)
+        tgb.text(f"{{{prefix}_page_label}}")
+
+
+# ------------------------------------------------------------------
+# DIAGNOSTICS
+# ------------------------------------------------------------------
+def unlock_diagnostics(state):
+    if ADMIN_TOKEN and hmac.compare_digest(state.diag_token, ADMIN_TOKEN):
+        state.diag_unlocked = True
+        refresh_diagnostics(state)
+    state.diag_token = ""
+
+
+def refresh_diagnostics(state):
+    if not state.diag_unlocked:
+        return
+    state.diag_stages_df = metrics.summary("stage")
+    state.diag_callbacks_df = metrics.summary("callback")
+    cache = result_cache.stats()
+    state.diag_cache_text = (
+        f"Result cache: {cache['entries']:,} entries, "
+        f"{cache['bytes'] / 1e6:,.1f} / {cache['max_bytes'] / 1e6:,.0f} MB, "
+        f"hit rate {cache['hit_rate']:.1%}, {cache['evictions']:,} evictions; "
+        f"{cache['pinned']:,} entries ({cache['pinned_bytes'] / 1e6:,.1f} MB) "
+        f"shown by {pipeline.session_count():,} sessions"
+    )
+    metrics.log_summary()
+
+
 def sidebar():
     with tgb.part(class_name="sidebar"):
+        tgb.text("⏳ Updating…", class_name="busy-indicator", render="{busy}")
         tgb.text("## 📘 Navigation", mode="md")
         tgb.button("🏠 OVERVIEW", class_name="{nav_overview}", on_action=go_overview)
         tgb.button("🪨 GEOLOGY", class_name="{nav_geology}", on_action=go_geology)
@@ -673,6 +1300,33 @@ def sidebar():
         tgb.button("ℹ️ ABOUT", class_name="{nav_about}", on_action=go_about)
 
 
+def map_chart(metric):
+    # one chart per metric, shown while it is selected: the marker colors
+    # are constants of its config, not per-row columns of map_df
+    m = MAP_METRICS[metric]
+    with tgb.part(render=f"{{map_metric == '{metric}'}}"):
+        tgb.chart(
+            type="scatter",
+            data="{map_df}",
+            x="Xcoor",
+            y="Ycoor",
+            marker={
+                "size": "map_size",
+                "color": m["fill"],
+                "line": {"width": 1, "color": m["border"]},
+            },
+            text="hover_text",
+            mode="markers",
+            on_range_change=on_map_range,
+            height="700px",
+            width="100%",
+            layout={
+                "xaxis": {"scaleanchor": "y"},
+                "yaxis": {"automargin": True},
+            },
+        )
+
+
 # ------------------------------------------------------------------
 # PAGE LAYOUTS
 # ------------------------------------------------------------------
@@ -743,7 +1397,7 @@ with tgb.Page() as overview_page:
             tgb.selector(
                 label="Company",
                 value="{company_filter}",
-                lov=company_lov,
+                lov="{company_lov}",
                 multiple=True,
                 dropdown=True,
                 on_change=on_change,
@@ -751,7 +1405,7 @@ with tgb.Page() as overview_page:
             tgb.selector(
                 label="Field",
                 value="{field_filter}",
-                lov=field_lov,
+                lov="{field_lov}",
                 multiple=True,
                 dropdown=True,
                 on_change=on_change,
@@ -759,7 +1413,7 @@ with tgb.Page() as overview_page:
             tgb.selector(
                 label="Well Type",
                 value="{well_type_filter}",
-                lov=well_type_lov,
+                lov="{well_type_lov}",
                 multiple=True,
                 dropdown=True,
                 on_change=on_change,
@@ -768,8 +1422,8 @@ with tgb.Page() as overview_page:
                 tgb.text("📅 Year Range")
                 tgb.slider(
                     value="{year_range}",
-                    min=year_min,
-                    max=year_max,
+                    min="{year_min}",
+                    max="{year_max}",
                     on_change=on_change,
                 )
 
@@ -844,13 +1498,15 @@ with tgb.Page() as geology_page:
         with tgb.part(class_name="card"):
             tgb.text("### 📏 Depth Distribution of Wells", mode="md")
             tgb.chart(
-                type="histogram",
-                data="{filtered_prod}",
-                x="depth",
+                type="bar",
+                data="{depth_hist_df}",
+                x="bin_center",
+                y="count",
                 height="350px",
                 layout={
                     "xaxis": {"title": {"text": "Depth (ft)"}},
                     "yaxis": {"title": {"text": "Number of wells"}},
+                    "bargap": 0,
                 },
             )
 
@@ -936,13 +1592,15 @@ with tgb.Page() as drilling_page:
         with tgb.part(class_name="card"):
             tgb.text("### 📏 Depth Distribution (ft)", mode="md")
             tgb.chart(
-                type="histogram",
-                data="{filtered_prod}",
-                x="depth",
+                type="bar",
+                data="{depth_hist_df}",
+                x="bin_center",
+                y="count",
                 height="350px",
                 layout={
                     "xaxis": {"title": {"text": "Depth (ft)"}},
                     "yaxis": {"title": {"text": "Count"}},
+                    "bargap": 0,
                 },
             )
 
@@ -952,13 +1610,15 @@ with tgb.Page() as drilling_page:
             with tgb.part(class_name="card"):
                 tgb.text("Lateral Length Distribution", mode="md")
                 tgb.chart(
-                    type="histogram",
-                    data="{filtered_frac}",
-                    x="lateral_length_ft",
+                    type="bar",
+                    data="{lateral_hist_df}",
+                    x="bin_center",
+                    y="count",
                     height="350px",
                     layout={
                         "xaxis": {"title": {"text": "Lateral Length (ft)"}},
                         "yaxis": {"title": {"text": "Count"}},
+                        "bargap": 0,
                     },
                 )
 
@@ -1311,25 +1971,8 @@ with tgb.Page() as map_page:
                 on_change=on_change,
             )
 
-        tgb.chart(
-            type="scatter",
-            data="{map_df}",
-            x="Xcoor",
-            y="Ycoor",
-            marker={
-                "size": "map_size",
-                "color": "map_color",
-                "line": {"width": 1, "color": "map_border_color"},
-            },
-            text="hover_text",
-            mode="markers",
-            height="700px",
-            width="100%",
-            layout={
-                "xaxis": {"scaleanchor": "y"},
-                "yaxis": {"automargin": True},
-            },
-        )
+        map_chart("Oil")
+        map_chart("Gas")
 
 # Wells Page
 with tgb.Page() as wells_page:
@@ -1337,11 +1980,10 @@ with tgb.Page() as wells_page:
     with tgb.part(class_name="main-content"):
         tgb.text("# 🔎 Well Explorer", mode="md")
 
-        well_lov = sorted(prod["well_name"].dropna().unique())
         tgb.selector(
             label="Select Well",
             value="{selected_well}",
-            lov=well_lov,
+            lov="{well_lov}",
             dropdown=True,
             on_change=on_change,
         )
@@ -1367,13 +2009,45 @@ with tgb.Page() as data_page:
     with tgb.part(class_name="main-content"):
         tgb.text("# 📄 Data Explorer", mode="md")
 
+        tgb.selector(
+            label="Download format",
+            value="{export_format}",
+            lov="{export_format_lov}",
+            dropdown=True,
+        )
+
         tgb.text("### Production Table", mode="md")
-        tgb.table(data="{filtered_prod_view}")
-        tgb.button("Download Prod Data CSV", on_action=download_filtered_prod)
+        table_controls("prod")
+        tgb.table(
+            data="{filtered_prod_view}",
+            page_size=TABLE_PAGE_SIZE,
+            sortable=False,
+        )
+        tgb.button("Download Prod Data", on_action=download_filtered_prod)
 
         tgb.text("### Frac Table", mode="md")
-        tgb.table(data="{filtered_frac_view}")
-        tgb.button("Download Frac Data CSV", on_action=download_filtered_frac)
+        table_controls("frac")
+        tgb.table(
+            data="{filtered_frac_view}",
+            page_size=TABLE_PAGE_SIZE,
+            sortable=False,
+        )
+        tgb.button("Download Frac Data", on_action=download_filtered_frac)
+
+# Diagnostics Page (only routed when VM_ADMIN_TOKEN is set)
+with tgb.Page() as diagnostics_page:
+    with tgb.part(class_name="main-content"):
+        tgb.text("# 🩺 Diagnostics", mode="md")
+        with tgb.part(render="{not diag_unlocked}"):
+            tgb.input(value="{diag_token}", label="Admin token", password=True)
+            tgb.button("Unlock", on_action=unlock_diagnostics)
+        with tgb.part(render="{diag_unlocked}"):
+            tgb.button("Refresh", on_action=refresh_diagnostics)
+            tgb.text("{diag_cache_text}")
+            tgb.text("### Pipeline stages (rolling window, computed runs)", mode="md")
+            tgb.table(data="{diag_stages_df}", page_size=50)
+            tgb.text("### Callbacks", mode="md")
+            tgb.table(data="{diag_callbacks_df}", page_size=50)
 
 # Links of Interest Page
 with tgb.Page() as links_page:
@@ -1517,7 +2191,9 @@ with tgb.Page() as about_page:
 # ------------------------------------------------------------------
 # APP ENTRYPOINT
 # ------------------------------------------------------------------
-if __name__ == "__main__":
+def main(port=None, host="0.0.0.0", watch=True):
+    """Serve the dashboard. ``watch=False``: the data files are watched by
+    a supervising process, which signals reloads (see serve.py)."""
     pages = {
         "/": overview_page,
         "geology": geology_page,
@@ -1530,13 +2206,25 @@ if __name__ == "__main__":
         "links": links_page,
         "about": about_page,
     }
-    port = int(os.getenv("PORT", "5000"))  # for Render / Vercel / etc.
+    if ADMIN_TOKEN:
+        pages["diagnostics"] = diagnostics_page
+    if port is None:
+        port = int(os.getenv("PORT", "5000"))  # for Render / Vercel / etc.
     gui = Gui(pages=pages, css_file="css/styles.css")
+    if watch:
+        # picks up the monthly data files without a restart
+        DataWatcher(DATA_PATHS.values(), lambda: reload_data(gui)).start()
+    else:
+        reload_on_signal(gui)
     gui.run(
         title="Vaca Muerta Dashboard",
         dark_mode=False,
-        host="0.0.0.0",
+        host=host,
         port=port,
         use_reloader=False,
         debug=False,
     )
+
+
+if __name__ == "__main__":
+    main()
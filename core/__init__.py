@@ -0,0 +1 @@
+"""Data and compute layer behind the Vaca Muerta dashboard (app.py)."""
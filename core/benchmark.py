@@ -0,0 +1,334 @@
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+from core.synthetic import generate
+
+logger = logging.getLogger(__name__)
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# ------------------------------------------------------------------
+# CONFIG
+# ------------------------------------------------------------------
+DEFAULT_SCALES = [1, 10, 100]
+WORK_DIR = os.getenv("VM_BENCH_DIR", "/tmp/vm_bench")
+REPEATS = 3  # timed runs per scenario (the median is reported)
+PARALLEL_WORKERS = min(4, os.cpu_count() or 1)  # pool size for the parallel pass
+SESSIONS = 50  # live sessions for the memory-per-session figure
+SESSION_FILTER_SETS = (1, 5, 10)  # distinct filter sets they are spread over
+
+
+# ------------------------------------------------------------------
+# STATE STAND-IN
+# ------------------------------------------------------------------
+class BenchState:
+    """Plain-attribute stand-in for a Taipy ``State``.
+
+    Starts from the module's public, non-callable globals, as a new Taipy
+    session does; the pipeline memo is keyed by ``id()`` for such objects.
+    """
+
+    def __init__(self, module, **overrides):
+        for name, value in vars(module).items():
+            if name.startswith("_") or callable(value) or hasattr(value, "__file__"):
+                continue
+            setattr(self, name, value)
+        for name, value in overrides.items():
+            setattr(self, name, value)
+
+
+def scenarios(app):
+    """Representative filter sets, picked from the loaded data."""
+    data = app._data
+    prod = data.prod
+    company = prod["company"].value_counts().index[0]
+    field = prod.loc[prod["company"] == company, "field"].value_counts().index[0]
+    recent = [max(data.year_min, data.year_max - 2), data.year_max]
+    return {
+        "all": {},
+        "company": {"company_filter": [company]},
+        "field": {"field_filter": [field]},
+        "well_type": {"well_type_filter": ["Petrolífero"]},
+        "recent_years": {"year_range": recent},
+        "combined": {
+            "company_filter": [company],
+            "well_type_filter": ["Petrolífero"],
+            "year_range": recent,
+        },
+    }
+
+
+def _median(values):
+    return float(pd.Series(values).median())
+
+
+def peak_allocation(app, filters):
+    """Peak bytes allocated by one cold update_state (tracemalloc)."""
+    app.result_cache.clear()
+    state = BenchState(app, **filters)
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    app.update_state(state, "bench", all_pages=True)
+    peak = tracemalloc.get_traced_memory()[1] - base
+    if not tracing:
+        tracemalloc.stop()
+    app.pipeline.drop_session(state)
+    return peak
+
+
+def session_filter_sets(app, n):
+    """``n`` distinct filter sets: one company each, then one year each."""
+    data = app._data
+    sets = [{"company_filter": [c]} for c in data.prod["company"].value_counts().index]
+    sets += [{"year_range": [y, y]} for y in range(data.year_min, data.year_max + 1)]
+    return sets[:n]
+
+
+def session_memory(app, sessions=SESSIONS, distinct=SESSION_FILTER_SETS):
+    """Python heap held per live session, every page computed.
+
+    ``sessions`` sessions are spread round-robin over ``n`` distinct filter
+    sets and kept alive; the traced heap growth over all of them (shared
+    results included), divided by their number, is the per-session figure.
+    Returns ``{n: MB per session}``.
+    """
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    result = {}
+    for n in distinct:
+        app.result_cache.clear()
+        sets = session_filter_sets(app, n)
+        gc.collect()
+        base = tracemalloc.get_traced_memory()[0]
+        states = []
+        for i in range(sessions):
+            state = BenchState(app, **sets[i % len(sets)])
+            states.append(state)
+            app.update_state(state, "bench", all_pages=True)
+        gc.collect()
+        grown = tracemalloc.get_traced_memory()[0] - base
+        result[len(sets)] = round(grown / sessions / 1e6, 3)
+        for state in states:
+            app.pipeline.drop_session(state)
+    if not tracing:
+        tracemalloc.stop()
+    return result
+
+
+def run_scenario(app, filters, repeats=REPEATS, trace_alloc=True):
+    """Time update_state for one filter set, cold and warm.
+
+    cold: empty result cache, new session (every node computed)
+    shared: new session, cache filled by another session (hits)
+    repeat: same session, unchanged inputs (every node skipped)
+    Stage timings are the medians of the cold runs. With ``trace_alloc``
+    one extra cold run is traced for its peak allocation.
+    """
+    cold, shared, repeat = [], [], []
+    stages = {}
+    # stand-in sessions are keyed by id(): keep them alive so a new one
+    # never inherits a freed one's memo
+    sessions = []
+    for _ in range(repeats):
+        app.result_cache.clear()
+        state = BenchState(app, **filters)
+        sessions.append(state)
+        stats = {}
+        t0 = time.perf_counter()
+        app.update_state(state, "bench", all_pages=True, stats=stats)
+        cold.append(time.perf_counter() - t0)
+        for name, (_, seconds) in stats.items():
+            stages.setdefault(name, []).append(seconds)
+
+        other = BenchState(app, **filters)
+        sessions.append(other)
+        t0 = time.perf_counter()
+        app.update_state(other, "bench", all_pages=True)
+        shared.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        app.update_state(other, "bench", all_pages=True)
+        repeat.append(time.perf_counter() - t0)
+
+    result = {
+        "filters": filters,
+        "cold_s": _median(cold),
+        "shared_cache_s": _median(shared),
+        "unchanged_s": _median(repeat),
+        "stages_s": {name: _median(v) for name, v in stages.items()},
+    }
+    if trace_alloc:
+        result["peak_alloc_mb"] = round(peak_allocation(app, filters) / 1e6, 2)
+    for state in sessions:
+        app.pipeline.drop_session(state)
+    return result
+
+
+# ------------------------------------------------------------------
+# RUNNERS
+# ------------------------------------------------------------------
+def bench_current_dir(repeats=REPEATS, workers=PARALLEL_WORKERS):
+    """Import app.py against ./data and time every scenario.
+
+    Scenarios run with inline node evaluation, then again with a pool of
+    ``workers`` threads; ``parallel`` reports the cold-run speedup.
+    ``session_mb`` is the heap held per live session (``session_memory``).
+    """
+    t0 = time.perf_counter()
+    import app
+
+    import_s = time.perf_counter() - t0
+    logging.disable(logging.INFO)  # pipeline runs log one line each
+
+    app.pipeline.set_workers(1)
+    serial = {
+        name: run_scenario(app, filters, repeats)
+        for name, filters in scenarios(app).items()
+    }
+    app.pipeline.set_workers(workers)
+    parallel = {}
+    for name, filters in scenarios(app).items():
+        cold_s = run_scenario(app, filters, repeats, trace_alloc=False)["cold_s"]
+        parallel[name] = {
+            "cold_s": cold_s,
+            "speedup": serial[name]["cold_s"] / cold_s if cold_s else None,
+        }
+
+    app.pipeline.set_workers(1)
+    return {
+        "import_s": import_s,
+        "rows": {name: len(df) for name, df in app._data.datasets.items()},
+        "scenarios": serial,
+        "parallel": {"workers": workers, "scenarios": parallel},
+        "session_mb": session_memory(app),
+    }
+
+
+def bench_scale(scale, work_dir=WORK_DIR, repeats=REPEATS, workers=PARALLEL_WORKERS):
+    """Generate (once) the data for ``scale`` and benchmark it in a child.
+
+    app.py loads its data at import, so each scale runs in its own
+    interpreter with ./data pointing at the synthetic CSV's.
+    """
+    root = os.path.join(work_dir, f"x{scale:g}")
+    data_dir = os.path.join(root, "data")
+    if not os.path.exists(os.path.join(data_dir, "well_prod_data.csv")):
+        generate(
+            data_dir,
+            scale,
+            template_path=os.path.join(REPO_DIR, "data", "well_frac_data.csv"),
+        )
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_DIR, env.get("PYTHONPATH")]))
+    env["VM_CACHE_DIR"] = os.path.join(data_dir, ".cache")
+    out = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "core.benchmark",
+            "--here",
+            "--repeats",
+            str(repeats),
+            "--workers",
+            str(workers),
+        ],
+        cwd=root,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(out.stdout)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_DIR,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except OSError:
+        return None
+
+
+def run(
+    scales=DEFAULT_SCALES, work_dir=WORK_DIR, repeats=REPEATS, workers=PARALLEL_WORKERS
+):
+    results = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "repeats": repeats,
+        "cpus": os.cpu_count(),
+        "scales": {},
+    }
+    for scale in scales:
+        logger.info("benchmarking x%g", scale)
+        results["scales"][f"x{scale:g}"] = bench_scale(
+            scale, work_dir, repeats, workers
+        )
+    return results
+
+
+if __name__ == "__main__":
+    # python -m core.benchmark --scales 1 10 100 --out bench.json
+    parser = argparse.ArgumentParser(description="Time update_state at scale")
+    parser.add_argument("--scales", type=float, nargs="+", default=DEFAULT_SCALES)
+    parser.add_argument("--work-dir", default=WORK_DIR)
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--workers", type=int, default=PARALLEL_WORKERS)
+    parser.add_argument("--out", default="bench.json")
+    parser.add_argument("--here", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.here:  # child process: ./data is the synthetic dataset
+        json.dump(bench_current_dir(args.repeats, args.workers), sys.stdout)
+    else:
+        logging.basicConfig(level=logging.INFO)
+        results = run(args.scales, args.work_dir, args.repeats, args.workers)
+        with open(args.out, "w") as fh:
+            json.dump(results, fh, indent=2)
+        for label, scale in results["scales"].items():
+            parallel = scale["parallel"]
+            for name, sc in scale["scenarios"].items():
+                par = parallel["scenarios"][name]
+                print(
+                    "%-5s %-13s cold %7.3fs  shared %7.3fs  unchanged %7.4fs"
+                    "  peak %7.1f MB  | %d workers %7.3fs (x%.2f)"
+                    % (
+                        label,
+                        name,
+                        sc["cold_s"],
+                        sc["shared_cache_s"],
+                        sc["unchanged_s"],
+                        sc["peak_alloc_mb"],
+                        parallel["workers"],
+                        par["cold_s"],
+                        par["speedup"] or 0,
+                    )
+                )
+            for n, mb in scale["session_mb"].items():
+                print(
+                    "%-5s %d sessions over %s filter sets: %7.2f MB/session"
+                    % (label, SESSIONS, n, mb)
+                )
+        print("wrote", args.out)
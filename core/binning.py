@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+
+HISTOGRAM_COLUMNS = ["bin_start", "bin_end", "bin_center", "count"]
+
+
+def histogram_frame(values, bins=30, value_range=None):
+    """Pre-binned histogram of ``values`` as a small frame for a bar chart.
+
+    NaNs/infinities are dropped. Returns one row per bin with its edges,
+    center (the bar position) and count.
+    """
+    values = np.asarray(values, dtype="float64")
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        return pd.DataFrame(columns=HISTOGRAM_COLUMNS)
+
+    counts, edges = np.histogram(values, bins=bins, range=value_range)
+    return pd.DataFrame(
+        {
+            "bin_start": edges[:-1],
+            "bin_end": edges[1:],
+            "bin_center": (edges[:-1] + edges[1:]) / 2,
+            "count": counts,
+        }
+    )
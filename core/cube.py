@@ -0,0 +1,280 @@
+import numpy as np
+import pandas as pd
+
+from core.filter_index import FilterIndex, filter_frame
+
+# ------------------------------------------------------------------
+# CONFIG
+# ------------------------------------------------------------------
+DIMENSIONS = ("company", "field", "well_type")
+MEASURES = ("oil_prod_m3", "gas_prod_km3", "water_prod_m3")
+
+
+# ------------------------------------------------------------------
+# CUBE
+# ------------------------------------------------------------------
+class ProductionCube:
+    """Monthly production rolled up at (company, field, well_type, year, month).
+
+    ``cells`` holds float64 sums of the production measures plus the depth
+    sum/count (for the row-weighted average depth). Distinct wells are kept
+    at year grain, the finest grain the year-range filter can select:
+    ``well_cells`` maps each (company, field, well_type, year) to the ids of
+    the wells producing in it, so well counts stay exact.
+    """
+
+    def __init__(self, prod):
+        keys = list(DIMENSIONS) + ["year", "month"]
+        values = prod[keys + ["date", "well_id", "depth"]].copy()
+        for col in MEASURES:
+            values[col] = prod[col].astype("float64")
+
+        grouped = values.groupby(keys, observed=True, sort=True)
+        cells = grouped[list(MEASURES)].sum()
+        cells["depth_sum"] = grouped["depth"].sum()
+        cells["depth_n"] = grouped["depth"].count()
+        cells["date"] = grouped["date"].first()
+        self.cells = cells.reset_index()
+
+        by_year = values.groupby(list(DIMENSIONS) + ["year"], observed=True, sort=True)
+        wells = by_year["well_id"].unique()
+        self.well_cells = wells.index.to_frame(index=False)
+        self.well_ids = [np.asarray(ids) for ids in wells.to_numpy()]
+
+        # per-well depth from the latest record with one (depth is per well)
+        self.well_depth = (
+            values.dropna(subset=["depth"])
+            .sort_values(["year", "month"], kind="stable")
+            .groupby("well_id")["depth"]
+            .last()
+        )
+
+        self.cells_index = FilterIndex(self.cells, DIMENSIONS)
+        self.well_cells_index = FilterIndex(self.well_cells, DIMENSIONS)
+
+    def select(self, selections, year_range):
+        """Cube cells matching the filters, as a CubeSlice."""
+        cells = filter_frame(self.cells, self.cells_index, selections, year_range)
+        well_cells = filter_frame(
+            self.well_cells, self.well_cells_index, selections, year_range
+        )
+        return CubeSlice(
+            self,
+            cells,
+            well_cells,
+            [self.well_ids[i] for i in well_cells.index],
+        )
+
+
+class CubeSlice:
+    def __init__(self, cube, cells, well_cells, well_ids):
+        self.cube = cube
+        self.cells = cells
+        self.well_cells = well_cells
+        self.well_ids = well_ids
+
+    @property
+    def empty(self):
+        return self.cells.empty
+
+    def _distinct(self, id_arrays):
+        if not id_arrays:
+            return 0
+        return len(np.unique(np.concatenate(id_arrays)))
+
+    def distinct_wells(self):
+        if not self.well_ids:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(self.well_ids))
+
+    def well_depths(self):
+        """One depth per distinct well in the slice."""
+        return self.cube.well_depth.reindex(self.distinct_wells()).dropna()
+
+    def totals(self):
+        """Measure sums, distinct wells and row-weighted average depth."""
+        out = {col: float(self.cells[col].sum()) for col in MEASURES}
+        depth_n = self.cells["depth_n"].sum()
+        out["avg_depth"] = (
+            float(self.cells["depth_sum"].sum()) / depth_n if depth_n else np.nan
+        )
+        out["n_wells"] = self._distinct(self.well_ids)
+        return out
+
+    def wells_by_type(self):
+        types = self.well_cells["well_type"].astype(str).to_numpy()
+        rows = []
+        for well_type in np.unique(types):
+            positions = np.flatnonzero(types == well_type)
+            ids = [self.well_ids[i] for i in positions]
+            rows.append((well_type, self._distinct(ids)))
+        return (
+            pd.DataFrame(rows, columns=["well_type", "n_wells"])
+            .sort_values("n_wells", ascending=False)
+            .reset_index(drop=True)
+        )
+
+    def depth_by_type(self):
+        """Row-weighted average depth per well type, deepest first."""
+        sums = self.cells.groupby("well_type", as_index=False, observed=True)[
+            ["depth_sum", "depth_n"]
+        ].sum()
+        return pd.DataFrame(
+            {
+                "well_type": sums["well_type"],
+                "avg_depth": sums["depth_sum"] / sums["depth_n"],
+            }
+        ).sort_values("avg_depth", ascending=False)
+
+    def time_series(self):
+        return (
+            self.cells.groupby("date", as_index=False)[list(MEASURES)]
+            .sum()
+            .sort_values("date")
+        )
+
+
+# ------------------------------------------------------------------
+# CONSISTENCY CHECK & BENCHMARK
+# ------------------------------------------------------------------
+def _raw_results(prod, index, selections, year_range):
+    """The same outputs computed by scanning the filtered monthly rows."""
+    d1 = filter_frame(prod, index, selections, year_range)
+    totals = {col: float(d1[col].sum()) for col in MEASURES}
+    totals["avg_depth"] = float(d1["depth"].mean())
+    totals["n_wells"] = d1["well_id"].nunique()
+    by_type = (
+        d1.groupby("well_type", as_index=False, observed=True)["well_id"]
+        .nunique()
+        .rename(columns={"well_id": "n_wells"})
+    )
+    series = d1.groupby("date", as_index=False)[list(MEASURES)].sum()
+    depths = d1.groupby("well_type", observed=True)["depth"].mean()
+    return totals, by_type, series, depths
+
+
+def _cube_results(cube, selections, year_range):
+    cube_slice = cube.select(selections, year_range)
+    depths = cube_slice.depth_by_type().set_index("well_type")["avg_depth"]
+    return (
+        cube_slice.totals(),
+        cube_slice.wells_by_type(),
+        cube_slice.time_series(),
+        depths,
+    )
+
+
+def _scenarios(prod):
+    top_company = str(prod["company"].value_counts().index[0])
+    top_field = str(prod["field"].value_counts().index[0])
+    top_type = str(prod["well_type"].value_counts().index[0])
+    years = sorted(prod["year"].unique())
+    mid = int(years[len(years) // 2])
+    return {
+        "all": ({}, (years[0], years[-1])),
+        "company": ({"company": (top_company,)}, (years[0], years[-1])),
+        "field_type": (
+            {"field": (top_field,), "well_type": (top_type,)},
+            (years[0], years[-1]),
+        ),
+        "narrow_years": ({"company": (top_company,)}, (mid, mid + 1)),
+    }
+
+
+def check_consistency(prod, cube, rel_tol):
+    index = FilterIndex(prod, DIMENSIONS)
+    failures = []
+    for name, (selections, year_range) in _scenarios(prod).items():
+        raw = _raw_results(prod, index, selections, year_range)
+        fast = _cube_results(cube, selections, year_range)
+
+        for key, ref in raw[0].items():
+            val = fast[0][key]
+            if abs(ref - val) > rel_tol * max(abs(ref), 1.0):
+                failures.append(f"{name}: {key} raw={ref} cube={val}")
+
+        raw_types = dict(zip(raw[1]["well_type"].astype(str), raw[1]["n_wells"]))
+        cube_types = dict(zip(fast[1]["well_type"], fast[1]["n_wells"]))
+        if raw_types != cube_types:
+            failures.append(f"{name}: wells_by_type {raw_types} != {cube_types}")
+
+        merged = raw[2].merge(fast[2], on="date", suffixes=("_raw", "_cube"))
+        if len(merged) != len(raw[2]) or len(merged) != len(fast[2]):
+            failures.append(f"{name}: time series dates differ")
+        for col in MEASURES:
+            ref, val = merged[col + "_raw"], merged[col + "_cube"]
+            if ((ref - val).abs() > rel_tol * ref.abs().clip(lower=1.0)).any():
+                failures.append(f"{name}: time series {col} differs")
+
+        ref, val = raw[3].align(fast[3])
+        if ((ref - val).abs() > rel_tol * ref.abs().clip(lower=1.0)).any():
+            failures.append(f"{name}: depth by type differs")
+    return failures
+
+
+def scale_production(prod, factor):
+    """``factor`` copies of the production table with disjoint well ids."""
+    offset = int(prod["well_id"].max()) + 1
+    return pd.concat(
+        [prod.assign(well_id=prod["well_id"] + k * offset) for k in range(factor)],
+        ignore_index=True,
+    )
+
+
+def benchmark(prod, cube, repeat=5):
+    import time
+
+    index = FilterIndex(prod, DIMENSIONS)
+    timings = {}
+    for name, (selections, year_range) in _scenarios(prod).items():
+        for label, run in (
+            ("raw", lambda: _raw_results(prod, index, selections, year_range)),
+            ("cube", lambda: _cube_results(cube, selections, year_range)),
+        ):
+            samples = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                run()
+                samples.append(time.perf_counter() - t0)
+            timings[(name, label)] = sorted(samples)[len(samples) // 2]
+    return timings
+
+
+if __name__ == "__main__":
+    # python -m core.cube data/well_prod_data.csv [scale]
+    import sys
+    import time
+
+    from core.loader import load_dataset
+    from core.schema import KPI_REL_TOLERANCE
+
+    base = load_dataset("prod", sys.argv[1])
+    factor = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    # float32 rows are summed in float64 by the cube, hence the 10x slack
+    failures = check_consistency(base, ProductionCube(base), KPI_REL_TOLERANCE * 10)
+    print("consistency:", "ok" if not failures else "FAILED")
+    for failure in failures:
+        print("  " + failure)
+
+    scaled = scale_production(base, factor)
+    t0 = time.perf_counter()
+    cube = ProductionCube(scaled)
+    print(
+        "%dx: %d rows -> %d cells, %d well cells, built in %.2fs"
+        % (
+            factor,
+            len(scaled),
+            len(cube.cells),
+            len(cube.well_cells),
+            time.perf_counter() - t0,
+        )
+    )
+    timings = benchmark(scaled, cube)
+    for name in _scenarios(scaled):
+        raw, fast = timings[(name, "raw")], timings[(name, "cube")]
+        print(
+            "  %-14s raw %8.1fms  cube %7.1fms  (%.0fx)"
+            % (name, raw * 1000, fast * 1000, raw / fast if fast else 0)
+        )
+    sys.exit(1 if failures else 0)
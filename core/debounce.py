@@ -0,0 +1,56 @@
+import threading
+
+
+class SessionDebouncer:
+    """Coalesces bursts of per-session requests into one trailing call.
+
+    Every ``submit`` bumps the session's generation and restarts its timer,
+    so a slider drag or several quick selector ticks run ``func`` once,
+    ``delay_s`` after the last change. Runs of one session are serialized,
+    and ``func`` receives an ``is_stale()`` predicate that turns true as
+    soon as a newer request arrives, so an in-flight computation for old
+    filters can stop early.
+    """
+
+    def __init__(self, delay_s):
+        self.delay_s = delay_s
+        self._timers = {}  # session id -> pending Timer
+        self._generations = {}  # session id -> latest request number
+        self._run_locks = {}  # session id -> Lock serializing its runs
+        self._lock = threading.Lock()
+
+    def submit(self, session_id, func):
+        with self._lock:
+            generation = self._generations.get(session_id, 0) + 1
+            self._generations[session_id] = generation
+            previous = self._timers.pop(session_id, None)
+            if previous is not None:
+                previous.cancel()
+            timer = threading.Timer(
+                self.delay_s, self._fire, (session_id, generation, func)
+            )
+            timer.daemon = True
+            self._timers[session_id] = timer
+        timer.start()
+        return generation
+
+    def is_stale(self, session_id, generation):
+        return self._generations.get(session_id) != generation
+
+    def _fire(self, session_id, generation, func):
+        with self._lock:
+            if self.is_stale(session_id, generation):
+                return
+            self._timers.pop(session_id, None)
+            run_lock = self._run_locks.setdefault(session_id, threading.Lock())
+
+        with run_lock:
+            if self.is_stale(session_id, generation):
+                return
+            func(lambda: self.is_stale(session_id, generation))
+
+        with self._lock:
+            # idle session: drop its bookkeeping
+            if not self.is_stale(session_id, generation):
+                del self._generations[session_id]
+                self._run_locks.pop(session_id, None)
@@ -0,0 +1,118 @@
+import gzip
+import logging
+import os
+import tempfile
+import time
+import uuid
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional, CSV always works
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------
+# CONFIG
+# ------------------------------------------------------------------
+EXPORT_DIR = os.getenv(
+    "VM_EXPORT_DIR", os.path.join(tempfile.gettempdir(), "vm_exports")
+)
+EXPORT_CHUNK_ROWS = 50_000  # rows serialized at a time (bounds peak memory)
+EXPORT_MAX_AGE_S = 3600  # served files older than this are removed
+
+EXPORT_FORMATS = {
+    "CSV": ".csv",
+    "CSV (gzip)": ".csv.gz",
+    "Parquet": ".parquet",
+}
+
+
+# ------------------------------------------------------------------
+# CHUNKED WRITERS
+# ------------------------------------------------------------------
+def iter_chunks(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start : start + chunk_rows]
+
+
+def _write_csv(df, path, compress, chunk_rows):
+    opener = gzip.open if compress else open
+    with opener(path, "wt", encoding="utf-8", newline="") as handle:
+        if df.empty:
+            df.head(0).to_csv(handle, index=False)
+        for i, chunk in enumerate(iter_chunks(df, chunk_rows)):
+            chunk.to_csv(handle, index=False, header=i == 0)
+
+
+def _write_parquet(df, path, chunk_rows):
+    if pq is None:
+        raise RuntimeError("Parquet export needs pyarrow")
+    schema = pa.Schema.from_pandas(df.head(0), preserve_index=False)
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in iter_chunks(df, chunk_rows):
+            writer.write_table(
+                pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            )
+
+
+def prune_exports(directory=EXPORT_DIR, max_age_s=EXPORT_MAX_AGE_S):
+    """Remove export files that were served long enough ago."""
+    cutoff = time.time() - max_age_s
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:  # already removed by another worker
+            pass
+
+
+# ------------------------------------------------------------------
+# PUBLIC API
+# ------------------------------------------------------------------
+def export_frame(
+    df, name, fmt="CSV", directory=EXPORT_DIR, chunk_rows=EXPORT_CHUNK_ROWS
+):
+    """Write ``df`` to a file chunk by chunk and return ``(path, file_name)``.
+
+    ``df`` may also be a core.selection.RowSelection: each chunk's rows are
+    then gathered from the base frame as they are written.
+
+    Only ``chunk_rows`` rows are serialized at a time, so memory stays
+    bounded whatever the export size; the file is then streamed to the
+    browser from disk.
+    """
+    suffix = EXPORT_FORMATS[fmt]
+    prune_exports(directory)
+    os.makedirs(directory, exist_ok=True)
+
+    file_name = name + suffix
+    path = os.path.join(directory, f"{uuid.uuid4().hex}-{file_name}")
+    tmp_path = path + ".tmp"
+
+    t0 = time.perf_counter()
+    try:
+        if fmt == "Parquet":
+            _write_parquet(df, tmp_path, chunk_rows)
+        else:
+            _write_csv(df, tmp_path, fmt == "CSV (gzip)", chunk_rows)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    logger.info(
+        "export %s: %d rows as %s, %.1f MB in %.2fs",
+        file_name,
+        len(df),
+        fmt,
+        os.path.getsize(path) / 1e6,
+        time.perf_counter() - t0,
+    )
+    return path, file_name
@@ -0,0 +1,197 @@
+import numpy as np
+import pandas as pd
+
+from core.selection import RowSelection
+
+
+# ------------------------------------------------------------------
+# CONFIG
+# ------------------------------------------------------------------
+ALL = "All"
+
+# Selector dimensions each dataset is filtered on (drilling and completion
+# data have never been filtered by well type)
+FILTER_DIMENSIONS = {
+    "prod": ("company", "field", "well_type"),
+    "frac": ("company", "field", "well_type"),
+    "drill": ("company", "field"),
+    "comp": ("company", "field"),
+}
+
+
+# ------------------------------------------------------------------
+# SELECTION NORMALIZATION
+# ------------------------------------------------------------------
+def normalize_selection(value):
+    """Canonical form of a selector value.
+
+    ``None`` means "no restriction" ("All", or a list containing it);
+    anything else is a sorted tuple of the selected values.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple, set)):
+        if ALL in value:
+            return None
+        return tuple(sorted({str(v) for v in value}))
+    if value == ALL:
+        return None
+    return (str(value),)
+
+
+def filter_key(company, field, well_type, year_range):
+    """Hashable canonical key of a full filter state.
+
+    List order, duplicates and the different "All" forms all map to the
+    same key, so it can be shared across sessions.
+    """
+    return (
+        normalize_selection(company),
+        normalize_selection(field),
+        normalize_selection(well_type),
+        int(year_range[0]),
+        int(year_range[1]),
+    )
+
+
+# ------------------------------------------------------------------
+# INVERTED INDEX
+# ------------------------------------------------------------------
+class FilterIndex:
+    """Sorted row-id postings per dimension value for one dataset.
+
+    When the rows are stored in year order (core/schema.py SORT_KEYS) the
+    index also keeps the year column, so a year range is located by binary
+    search instead of a scan (see ``year_bounds``).
+    """
+
+    def __init__(self, df, dimensions):
+        self.n_rows = len(df)
+        self.postings = {}
+        for dim in dimensions:
+            if dim in df.columns:
+                self.postings[dim] = self._build_postings(df[dim])
+
+        self.years = None
+        if "year" in df.columns:
+            years = df["year"].to_numpy()
+            if years.dtype.kind in "iu" and np.all(years[1:] >= years[:-1]):
+                self.years = years
+
+    @staticmethod
+    def _build_postings(column):
+        cat = pd.Categorical(column)
+        codes = np.asarray(cat.codes)
+        valid = codes >= 0
+
+        # a stable sort by code keeps row ids ascending inside each value
+        order = np.argsort(codes[valid], kind="stable")
+        row_ids = np.flatnonzero(valid)[order].astype(np.int64)
+        counts = np.bincount(codes[valid], minlength=len(cat.categories))
+        bounds = np.concatenate(([0], np.cumsum(counts)))
+
+        return {
+            str(value): row_ids[bounds[i] : bounds[i + 1]]
+            for i, value in enumerate(cat.categories)
+        }
+
+    def _rows_for(self, dim, values):
+        postings = self.postings[dim]
+        hits = [postings[v] for v in values if v in postings]
+        if not hits:
+            return np.empty(0, dtype=np.int64)
+        if len(hits) == 1:
+            return hits[0]
+        # values are disjoint, so a union is a concatenation + sort
+        return np.sort(np.concatenate(hits))
+
+    def select(self, selections):
+        """Row ids matching every restricted dimension, or None for all rows.
+
+        ``selections`` maps dimension -> normalized selection (see
+        ``normalize_selection``). Dimensions the dataset lacks are ignored.
+        """
+        row_sets = [
+            self._rows_for(dim, values)
+            for dim, values in selections.items()
+            if values is not None and dim in self.postings
+        ]
+        if not row_sets:
+            return None
+
+        row_sets.sort(key=len)
+        rows = row_sets[0]
+        for other in row_sets[1:]:
+            if len(rows) == 0:
+                break
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
+
+    def year_bounds(self, year_range):
+        """``(start, stop)`` rows of the inclusive year range, or None.
+
+        None when the rows are not stored in year order.
+        """
+        if self.years is None:
+            return None
+        # search with the column's own dtype: a Python int would make NumPy
+        # upcast (copy) the whole int16 column on every call
+        info = np.iinfo(self.years.dtype)
+        lo, hi = (
+            self.years.dtype.type(min(max(int(y), info.min), info.max))
+            for y in year_range[:2]
+        )
+        start = int(np.searchsorted(self.years, lo, "left"))
+        stop = int(np.searchsorted(self.years, hi, "right"))
+        return start, max(start, stop)
+
+
+def build_filter_indexes(datasets):
+    """One FilterIndex per dataset in ``datasets`` ({name: frame})."""
+    return {
+        name: FilterIndex(df, FILTER_DIMENSIONS.get(name, ()))
+        for name, df in datasets.items()
+    }
+
+
+# ------------------------------------------------------------------
+# FILTERING
+# ------------------------------------------------------------------
+def select_rows(df, index, selections, year_range):
+    """Rows of ``df`` matching the selections and the inclusive year range.
+
+    Returns a RowSelection: nothing is copied until columns are read. On
+    year-ordered data the range is a positional slice, cut out of the
+    (ascending) posting row ids by binary search when other filters
+    apply, so rows outside the range are never read.
+    """
+    rows = index.select(selections)
+    bounds = index.year_bounds(year_range)
+    if bounds is not None:
+        if rows is None:
+            return RowSelection(df, slice(*bounds))
+        first, last = np.searchsorted(rows, bounds)
+        return RowSelection(df, rows[first:last])
+
+    years = df["year"].to_numpy()
+    lo, hi = year_range[0], year_range[1]
+
+    if rows is None:
+        return RowSelection(df, np.flatnonzero((years >= lo) & (years <= hi)))
+
+    row_years = years[rows]
+    return RowSelection(df, rows[(row_years >= lo) & (row_years <= hi)])
+
+
+def filter_frame(df, index, selections, year_range):
+    """``select_rows`` materialized as a DataFrame."""
+    return select_rows(df, index, selections, year_range).frame()
+
+
+def filter_rows(df, selections, year_range):
+    """Direct mask filter, for frames too small to need an index (one well)."""
+    mask = (df["year"] >= year_range[0]) & (df["year"] <= year_range[1])
+    for dim, values in selections.items():
+        if values is not None and dim in df.columns:
+            mask &= df[dim].astype(str).isin(values)
+    return df[mask]
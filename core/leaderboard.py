@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+
+from core.prefix import DIMENSIONS
+
+# ------------------------------------------------------------------
+# CONFIG
+# ------------------------------------------------------------------
+MAX_N = 500  # longest leaderboard served, and kept per precomputed slice
+
+
+class Leaderboard:
+    """Top-N wells by their largest value of a column within the filters.
+
+    Built on the segments of a ``CumulativeIndex`` (runs of a well's rows
+    with the same company/field/well_type): the max of each column is kept
+    per (segment, year) cell. For a filter, the selected segments' cells in
+    the year range are reduced with ``np.fmax.reduceat``, a well's value is
+    the largest of its segments, and the top N come from a partial
+    selection (``argpartition``): only the N shown are sorted, so N can go
+    up to ``MAX_N`` without a sort of every well.
+
+    The boards of the unfiltered data and of each single company, field
+    and well type over all years are precomputed at build time, so the
+    common slices are a lookup. Ties are ordered by well name.
+    """
+
+    def __init__(self, prod, cum_index, columns, key="well_name"):
+        self.key = key
+        self.columns = tuple(columns)
+        self.segment_index = cum_index.segment_index
+        self.year_min = cum_index.year_min
+        self.year_max = cum_index.year_max
+        self.year_span = cum_index.year_span
+
+        # cells: runs of equal (segment, year) keys in the index's row order
+        row_keys = cum_index.row_keys
+        change = np.flatnonzero(row_keys[1:] != row_keys[:-1]) + 1
+        starts = np.concatenate(([0], change)) if len(row_keys) else change
+        self.cell_keys = row_keys[starts]
+        stored = starts if cum_index.order is None else cum_index.order[starts]
+
+        # a trailing NaN lets reduceat take every segment's end as an index
+        self.cell_max = {}
+        for col in self.columns:
+            values = prod[col].to_numpy(dtype="float64", na_value=np.nan)
+            if cum_index.order is not None:
+                values = values[cum_index.order]
+            cells = np.fmax.reduceat(values, starts) if len(starts) else values[:0]
+            self.cell_max[col] = np.append(cells, np.nan)
+
+        # well (key code, sorted by name) of each segment, from its first cell
+        segment_of_cell = self.cell_keys // self.year_span
+        first_cells = np.flatnonzero(
+            np.concatenate(([True], segment_of_cell[1:] != segment_of_cell[:-1]))
+        )
+        codes, self.names = pd.factorize(
+            prod[key].to_numpy()[stored[first_cells]], sort=True
+        )
+        self.segment_well = codes
+        self.names = np.asarray(self.names, dtype=object)
+
+        self._boards = {}  # (dim, value) or None -> {column: (codes, values)}
+        self._precompute(cum_index.segments)
+
+    # ------------------------------------------------------------------
+    def _cell_bounds(self, segments, year_range):
+        lo = max(int(year_range[0]), self.year_min)
+        hi = min(int(year_range[1]), self.year_max)
+        if lo > hi or len(segments) == 0:
+            return segments[:0], segments[:0], segments[:0]
+        base = segments.astype(np.int64) * self.year_span
+        first = np.searchsorted(self.cell_keys, base + (lo - self.year_min), "left")
+        last = np.searchsorted(self.cell_keys, base + (hi - self.year_min), "right")
+        has_cells = last > first
+        return segments[has_cells], first[has_cells], last[has_cells]
+
+    def well_values(self, column, selections, year_range):
+        """Largest value per well (NaN: no row, or no value, in the filters)."""
+        segments = self.segment_index.select(selections)
+        if segments is None:
+            segments = np.arange(len(self.segment_well))
+        segments, first, last = self._cell_bounds(segments, year_range)
+
+        best = np.full(len(self.names), np.nan)
+        if len(segments) == 0:
+            return best
+        # interleaved bounds: every even result is the max of one segment
+        bounds = np.empty(2 * len(first), dtype=np.int64)
+        bounds[0::2], bounds[1::2] = first, last
+        segment_max = np.fmax.reduceat(self.cell_max[column], bounds)[0::2]
+
+        wells = self.segment_well[segments]
+        named = wells >= 0
+        np.fmax.at(best, wells[named], segment_max[named])
+        return best
+
+    @staticmethod
+    def _top(values, n):
+        """Codes and values of the ``n`` largest non-NaN values, in order."""
+        codes = np.flatnonzero(~np.isnan(values))
+        values = values[codes]
+        if n == 0:
+            return codes[:0], values[:0]
+        if len(codes) > n:
+            # partial selection, then everything tied with the n-th value
+            nth = values[np.argpartition(-values, n - 1)[n - 1]]
+            keep = values >= nth
+            codes, values = codes[keep], values[keep]
+        # largest first, ties by name (codes follow the sorted names)
+        order = np.lexsort((codes, -values))[:n]
+        return codes[order], values[order]
+
+    def _precompute(self, segments):
+        boards = self._boards
+        full = (self.year_min, self.year_max)
+        for col in self.columns:
+            boards.setdefault(None, {})[col] = self._top(
+                self.well_values(col, {}, full), MAX_N
+            )
+        for dim in DIMENSIONS:
+            for value in segments[dim].dropna().unique():
+                selections = {dim: (str(value),)}
+                board = boards.setdefault((dim, str(value)), {})
+                for col in self.columns:
+                    board[col] = self._top(
+                        self.well_values(col, selections, full), MAX_N
+                    )
+
+    def _board(self, selections, year_range):
+        """The precomputed board matching the filters, or None."""
+        if int(year_range[0]) > self.year_min or int(year_range[1]) < self.year_max:
+            return None
+        restricted = [(d, v) for d, v in selections.items() if v is not None]
+        if not restricted:
+            return self._boards.get(None)
+        if len(restricted) == 1 and len(restricted[0][1]) == 1:
+            return self._boards.get((restricted[0][0], restricted[0][1][0]))
+        return None
+
+    def top(self, column, selections, year_range, n):
+        """The ``n`` (at most ``MAX_N``) wells with the largest ``column``.
+
+        A frame of ``key`` and ``column``, largest first.
+        """
+        n = max(0, min(int(n), MAX_N))
+        board = self._board(selections, year_range)
+        if board is not None:
+            codes, values = board[column]
+            codes, values = codes[:n], values[:n]
+        else:
+            codes, values = self._top(
+                self.well_values(column, selections, year_range), n
+            )
+        return pd.DataFrame({self.key: self.names[codes], column: values})
@@ -0,0 +1,221 @@
+import hashlib
+import io
+import logging
+import os
+import time
+
+import pandas as pd
+
+from core.partitions import (
+    concat_frames,
+    frame_dtypes,
+    partition_key,
+    read_manifest,
+    read_partitions,
+    remove_partitions,
+    write_manifest,
+    write_partitions,
+)
+from core.schema import apply_schema, frame_memory, memory_report, sort_rows
+from core.shared_store import map_frame, publish_frame, shared_path_for
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # the store is optional, CSV is always the source of truth
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------
+# CONFIG
+# ------------------------------------------------------------------
+CACHE_DIR = os.getenv("VM_CACHE_DIR", "data/.cache")
+CACHE_VERSION = 6  # bump whenever core/schema.py changes the typed layout
+HASH_CHUNK_BYTES = 8 * 1024 * 1024  # read size when checking an append
+
+# Serve datasets from memory-mapped Arrow files shared by every worker
+# process (see serve.py) instead of private per-process frames.
+SHARED_DATA = os.getenv("VM_SHARED_DATA", "0") == "1"
+
+
+# ------------------------------------------------------------------
+# PARTITIONED STORE
+# ------------------------------------------------------------------
+def _source_signature(csv_path):
+    st = os.stat(csv_path)
+    return {
+        "version": CACHE_VERSION,
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+    }
+
+
+def store_dir_for(csv_path):
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(CACHE_DIR, stem)
+
+
+def _prefix_digest(csv_path, size):
+    """Digest of the first ``size`` bytes of the file."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(csv_path, "rb") as fh:
+        remaining = size
+        while remaining > 0:
+            chunk = fh.read(min(HASH_CHUNK_BYTES, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+
+def _read_store(store, signature):
+    if pq is None:
+        return None
+    manifest = read_manifest(store)
+    if manifest is None or manifest.get("source") != signature:
+        return None
+    try:
+        return read_partitions(store, manifest["partitions"])
+    except Exception as exc:  # corrupt/partial store: rebuild from CSV
+        logger.warning("Ignoring unreadable store %s: %s", store, exc)
+        return None
+
+
+def _write_store(store, df, csv_path, signature):
+    if pq is None:
+        return
+    try:
+        partitions = write_partitions(store, df)
+        remove_partitions(store, partitions)
+        write_manifest(
+            store,
+            {
+                "source": signature,
+                "digest": _prefix_digest(csv_path, signature["size"]),
+                "partitions": partitions,
+                "dtypes": frame_dtypes(df),
+            },
+        )
+    except Exception as exc:  # read-only FS etc.: keep serving from CSV
+        logger.warning("Could not write store %s: %s", store, exc)
+
+
+def _appended_rows(csv_path, manifest):
+    """Rows appended to the CSV since the store was written, or None.
+
+    The monthly files only grow at the end: when the bytes the store was
+    built from are an unchanged prefix of the file (same digest, ending on
+    a line break), only the new tail is parsed. Any other edit returns None.
+    """
+    old = (manifest or {}).get("source") or {}
+    if old.get("version") != CACHE_VERSION:
+        return None
+    old_size = old["size"]
+    if os.path.getsize(csv_path) <= old_size:
+        return None
+    if _prefix_digest(csv_path, old_size) != manifest.get("digest"):
+        return None
+    with open(csv_path, "rb") as fh:
+        header = fh.readline()
+        fh.seek(old_size - 1)
+        if fh.read(1) != b"\n":
+            return None
+        tail = fh.read()
+    return pd.read_csv(io.BytesIO(header + tail))
+
+
+def _append_store(name, store, manifest, raw, csv_path, signature):
+    """Merge appended raw rows into the store, rewriting only their years.
+
+    Returns False (store untouched) when the new rows do not fit the
+    stored column layout; the caller then rebuilds from the full CSV.
+    """
+    delta = apply_schema(name, raw)
+    dtypes = manifest["dtypes"]
+    if set(delta.columns) != set(dtypes):
+        return False
+    for col, dtype in dtypes.items():
+        if dtype == "category" or str(delta[col].dtype) == dtype:
+            continue
+        try:
+            delta[col] = delta[col].astype(dtype)
+        except (TypeError, ValueError):
+            return False
+
+    partitions = dict(manifest["partitions"])
+    for year, part in delta.groupby("year", sort=True, dropna=False):
+        key = partition_key(year)
+        if key in partitions:
+            part = sort_rows(name, concat_frames([read_partitions(store, [key]), part]))
+        partitions.update(write_partitions(store, part[list(dtypes)]))
+    write_manifest(
+        store,
+        {
+            "source": signature,
+            "digest": _prefix_digest(csv_path, signature["size"]),
+            "partitions": partitions,
+            "dtypes": dtypes,
+        },
+    )
+    return True
+
+
+# ------------------------------------------------------------------
+# PUBLIC API
+# ------------------------------------------------------------------
+def load_dataset(name, csv_path, shared=None):
+    """Load one dataset from its year-partitioned Parquet store.
+
+    The store is rebuilt from the CSV when it changed, except when rows were
+    only appended (the monthly update): then just those rows are parsed and
+    merged into the partitions of their years. With ``shared`` (default: VM_SHARED_DATA=1) the typed frame is also
+    published as an Arrow IPC file and returned memory-mapped, so processes
+    loading the same data share its pages instead of holding a copy each.
+    """
+    t0 = time.perf_counter()
+    shared = SHARED_DATA if shared is None else shared
+    signature = _source_signature(csv_path)
+    store = store_dir_for(csv_path)
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    shared_path = shared_path_for(stem)
+
+    df = map_frame(shared_path, signature) if shared else None
+    source = "shared map"
+    if df is None:
+        df = _read_store(store, signature)
+        source = "partitions"
+    if df is None and pq is not None:
+        manifest = read_manifest(store)
+        raw = _appended_rows(csv_path, manifest)
+        if raw is not None and _append_store(
+            name, store, manifest, raw, csv_path, signature
+        ):
+            df = _read_store(store, signature)
+            source = "partitions + %d appended rows" % len(raw)
+    if df is None:
+        raw = pd.read_csv(csv_path)
+        raw_bytes = frame_memory(raw)
+        df = apply_schema(name, raw)
+        logger.info(memory_report(name, raw_bytes, frame_memory(df)))
+        _write_store(store, df, csv_path, signature)
+        source = "csv"
+    if shared and source != "shared map" and pq is not None:
+        publish_frame(df, shared_path, signature)
+        df = map_frame(shared_path, signature)
+        source += ", published shared map"
+
+    logger.info(
+        "Loaded %s (%d rows) from %s in %.3fs",
+        name,
+        len(df),
+        source,
+        time.perf_counter() - t0,
+    )
+    return df
+
+
+def load_datasets(paths):
+    """Load every dataset in ``paths`` ({name: csv_path})."""
+    return {name: load_dataset(name, path) for name, path in paths.items()}
@@ -0,0 +1,225 @@
+import argparse
+import glob
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+logger = logging.getLogger(__name__)
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# ------------------------------------------------------------------
+# CONFIG
+# ------------------------------------------------------------------
+DEFAULT_WORKERS = [1, 2, 4]
+BASE_PORT = int(os.getenv("VM_LOADTEST_PORT", "5600"))
+STARTUP_TIMEOUT_S = 600  # loading a large synthetic dataset takes a while
+PATHS = ["/", "/production", "/map", "/data"]
+REQUESTS_PER_WORKER = 20
+
+
+# ------------------------------------------------------------------
+# PROCESS MEMORY (Linux)
+# ------------------------------------------------------------------
+def memory_kb(pid):
+    """Rss / Pss / private kB of ``pid`` from /proc/<pid>/smaps_rollup.
+
+    Pss charges each shared page 1/n to each of the n processes mapping
+    it, so summing Pss over the workers is the real footprint.
+    """
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as fh:
+        for line in fh:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss_kb": fields.get("Rss", 0),
+        "pss_kb": fields.get("Pss", 0),
+        "private_kb": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+        "shared_kb": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+        "anon_kb": fields.get("Anonymous", 0),
+    }
+
+
+def children(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as fh:
+            return [int(p) for p in fh.read().split()]
+    except OSError:
+        return []
+
+
+def mapped_frame_copies(shared_dir):
+    """Anonymous memory a process allocates to map each shared frame.
+
+    A zero-copy frame only adds file-backed pages, so ``copied_mb`` should
+    stay near zero whatever ``frame_mb`` is; a column that pandas had to
+    convert (nulls, unsupported types) shows up here in every worker.
+    """
+    import pyarrow as pa
+
+    from core.shared_store import map_frame
+
+    frames = {}
+    for path in sorted(glob.glob(os.path.join(shared_dir, "*.arrow"))):
+        with pa.memory_map(path, "r") as source:
+            meta = pa.ipc.open_file(source).schema.metadata or {}
+        frames[path] = json.loads(meta.get(b"vm_source", b"{}"))
+    for path, signature in frames.items():
+        map_frame(path, signature)  # warm up: pandas/arrow allocate once
+
+    rows = []
+    for path, signature in frames.items():
+        before = memory_kb(os.getpid())["anon_kb"]
+        df = map_frame(path, signature)
+        copied_kb = memory_kb(os.getpid())["anon_kb"] - before
+        if df is None:
+            continue
+        rows.append(
+            {
+                "name": os.path.basename(path),
+                "frame_mb": round(float(df.memory_usage(index=False).sum()) / 2**20, 1),
+                "copied_mb": round(copied_kb / 1024, 1),
+            }
+        )
+        del df
+    return rows
+
+
+# ------------------------------------------------------------------
+# LOAD TEST
+# ------------------------------------------------------------------
+def _get(port, path, timeout=30):
+    url = f"http://127.0.0.1:{port}{path}"
+    with urllib.request.urlopen(url, timeout=timeout) as resp:
+        resp.read()
+        return resp.status
+
+
+def _wait_ready(port, proc, timeout=STARTUP_TIMEOUT_S):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with code {proc.returncode}")
+        try:
+            if _get(port, "/", timeout=5) == 200:
+                return
+        except OSError:
+            time.sleep(0.5)
+    raise TimeoutError(f"port {port} not ready after {timeout}s")
+
+
+def run_serve(workers, shared, data_root, port=BASE_PORT):
+    """Start serve.py, drive every worker, and report its memory."""
+    env = dict(os.environ)
+    env.update(
+        VM_WORKERS=str(workers),
+        VM_SHARED_DATA="1" if shared else "0",
+        PORT=str(port),
+        VM_CACHE_DIR=os.path.join(data_root, "data", ".cache"),
+        VM_SHARED_DIR=os.path.join(data_root, "data", ".shared"),
+        PYTHONPATH=os.pathsep.join(filter(None, [REPO_DIR, env.get("PYTHONPATH")])),
+    )
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(REPO_DIR, "serve.py")],
+        cwd=data_root,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        ports = [port] if workers == 1 else [port + 1 + i for i in range(workers)]
+        for p in ports:
+            _wait_ready(p, proc)
+        startup_s = time.perf_counter() - t0
+
+        latencies = []
+        for p in ports:
+            for i in range(REQUESTS_PER_WORKER):
+                t = time.perf_counter()
+                _get(p, PATHS[i % len(PATHS)])
+                latencies.append(time.perf_counter() - t)
+        latencies.sort()
+
+        pids = [proc.pid] if workers == 1 else children(proc.pid)
+        per_worker = [memory_kb(pid) for pid in pids]
+        parent = memory_kb(proc.pid) if workers > 1 else None
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+    total_pss = sum(m["pss_kb"] for m in per_worker)
+    if parent:
+        total_pss += parent["pss_kb"]
+    return {
+        "workers": workers,
+        "shared": shared,
+        "startup_s": round(startup_s, 2),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2),
+        "per_worker": per_worker,
+        "parent": parent,
+        "total_pss_mb": round(total_pss / 1024, 1),
+        "private_mb_per_worker": round(
+            sum(m["private_kb"] for m in per_worker) / len(per_worker) / 1024, 1
+        ),
+    }
+
+
+def run(worker_counts=DEFAULT_WORKERS, data_root=REPO_DIR, modes=(False, True)):
+    results = {
+        "data_root": data_root,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "cpus": os.cpu_count(),
+        "runs": [],
+    }
+    for shared in modes:
+        for workers in worker_counts:
+            logger.info("serving with %d workers (shared=%s)", workers, shared)
+            results["runs"].append(run_serve(workers, shared, data_root))
+    if True in modes:
+        shared_dir = os.path.join(data_root, "data", ".shared")
+        results["mapped_frames"] = mapped_frame_copies(shared_dir)
+    return results
+
+
+if __name__ == "__main__":
+    # python -m core.loadtest --workers 1 2 4 --data-root /tmp/vm_bench/x10
+    parser = argparse.ArgumentParser(description="Memory per serve.py worker")
+    parser.add_argument("--workers", type=int, nargs="+", default=DEFAULT_WORKERS)
+    parser.add_argument("--data-root", default=REPO_DIR, help="dir holding data/")
+    parser.add_argument("--out", default="loadtest.json")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    results = run(args.workers, os.path.abspath(args.data_root))
+    with open(args.out, "w") as fh:
+        json.dump(results, fh, indent=2)
+    for r in results["runs"]:
+        print(
+            "shared=%-5s workers=%d  total Pss %8.1f MB  private/worker %7.1f MB"
+            "  startup %6.1fs  p50 %6.1f ms"
+            % (
+                r["shared"],
+                r["workers"],
+                r["total_pss_mb"],
+                r["private_mb_per_worker"],
+                r["startup_s"],
+                r["p50_ms"],
+            )
+        )
+    for m in results.get("mapped_frames", []):
+        print(
+            "mapped %-20s frame %8.1f MB  copied per worker %7.1f MB"
+            % (m["name"], m["frame_mb"], m["copied_mb"])
+        )
@@ -0,0 +1,153 @@
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from core.selection import RowSelection
+
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------
+# CONFIG
+# ------------------------------------------------------------------
+WINDOW = 512  # samples kept per stage/callback for the percentiles
+SUMMARY_EVERY = 1000  # log a percentile summary every N samples
+PERCENTILES = (50, 90, 99)
+# trace Python allocations to record each callback's peak (slows them ~2x)
+TRACE_ALLOC = os.getenv("VM_TRACE_ALLOC", "0") == "1"
+if TRACE_ALLOC:
+    tracemalloc.start()
+
+
+# ------------------------------------------------------------------
+# HELPERS
+# ------------------------------------------------------------------
+def count_rows(value):
+    """Rows held by a frame, or by the frames of a dict of outputs."""
+    if isinstance(value, (pd.DataFrame, pd.Series, RowSelection)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(count_rows(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(count_rows(v) for v in value)
+    return 0
+
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_bytes():
+    """Resident set size of this process (Linux), None elsewhere."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+# ------------------------------------------------------------------
+# ROLLING METRICS
+# ------------------------------------------------------------------
+class RollingMetrics:
+    """Bounded per-name samples of wall time, rows, bytes and peak allocation.
+
+    Recording is an append under a lock; percentiles are only computed
+    when asked for (diagnostics page, periodic summary log), so it is
+    cheap enough to leave on. Names are ``(kind, name)`` pairs, e.g.
+    ``("stage", "prod_rows")`` or ``("callback", "on_change")``.
+    """
+
+    def __init__(self, window=WINDOW, summary_every=SUMMARY_EVERY):
+        self.window = window
+        self.summary_every = summary_every
+        self._samples = {}  # (kind, name) -> deque[(seconds, rows_in, rows_out, nbytes, peak)]
+        self._counts = {}  # (kind, name) -> total samples ever recorded
+        self._recorded = 0
+        self._lock = threading.Lock()
+
+    def record(
+        self, kind, name, seconds, rows_in=0, rows_out=0, nbytes=0, peak_bytes=0
+    ):
+        key = (kind, name)
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append((seconds, rows_in, rows_out, nbytes or 0, peak_bytes))
+            self._counts[key] = self._counts.get(key, 0) + 1
+            self._recorded += 1
+            log_summary = self._recorded % self.summary_every == 0
+        if log_summary:
+            self.log_summary()
+
+    @contextmanager
+    def measure(self, kind, name):
+        """Time a block; ``nbytes`` is the process RSS growth over it.
+
+        While tracemalloc is tracing (``VM_TRACE_ALLOC=1``) ``peak_bytes``
+        is the highest allocation above the block's starting point. The
+        peak is process-wide, so blocks running concurrently share it.
+        """
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            alloc0 = tracemalloc.get_traced_memory()[0]
+        rss0 = rss_bytes()
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - t0
+            rss1 = rss_bytes()
+            grown = max(0, rss1 - rss0) if rss0 is not None and rss1 else 0
+            peak = max(0, tracemalloc.get_traced_memory()[1] - alloc0) if tracing else 0
+            self.record(kind, name, elapsed, nbytes=grown, peak_bytes=peak)
+
+    def summary(self, kind=None):
+        """One row per stage/callback: percentiles of the rolling window."""
+        with self._lock:
+            items = [
+                (key, np.array(samples, dtype="float64"), self._counts[key])
+                for key, samples in self._samples.items()
+                if kind is None or key[0] == kind
+            ]
+
+        rows = []
+        for (k, name), data, total in items:
+            ms = data[:, 0] * 1000
+            row = {"kind": k, "name": name, "calls": total}
+            for p, value in zip(PERCENTILES, np.percentile(ms, PERCENTILES)):
+                row[f"p{p}_ms"] = round(float(value), 2)
+            row["max_ms"] = round(float(ms.max()), 2)
+            row["rows_in"] = int(data[:, 1].mean())
+            row["rows_out"] = int(data[:, 2].mean())
+            row["mb"] = round(float(data[:, 3].mean()) / 1e6, 3)
+            row["peak_mb"] = round(float(data[:, 4].max()) / 1e6, 3)
+            rows.append(row)
+
+        columns = ["kind", "name", "calls"]
+        columns += [f"p{p}_ms" for p in PERCENTILES]
+        columns += ["max_ms", "rows_in", "rows_out", "mb", "peak_mb"]
+        frame = pd.DataFrame(rows, columns=columns)
+        return frame.sort_values(f"p{PERCENTILES[-1]}_ms", ascending=False)
+
+    def log_summary(self):
+        logger.info(
+            json.dumps(
+                {"event": "metrics_summary", "rows": self.summary().to_dict("records")}
+            )
+        )
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self._recorded = 0
@@ -0,0 +1,113 @@
+import json
+import logging
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # the store is optional, CSV is always the source of truth
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------
+# CONFIG
+# ------------------------------------------------------------------
+MANIFEST = "manifest.json"
+NULL_YEAR = "null"  # partition key of rows without a year
+
+
+# ------------------------------------------------------------------
+# YEAR PARTITIONS
+# ------------------------------------------------------------------
+# A dataset is one directory holding a Parquet file per year plus a JSON
+# manifest (source signature, rows per partition, column dtypes). Rows are
+# year-ordered in memory (core/schema.py SORT_KEYS), so the partitions read
+# back in year order concatenate to the same frame, and an update only
+# rewrites the years it touches.
+def partition_key(year):
+    return NULL_YEAR if pd.isna(year) else str(int(year))
+
+
+def _partition_order(key):
+    return (key == NULL_YEAR, int(key) if key != NULL_YEAR else 0)
+
+
+def partition_path(directory, key):
+    return os.path.join(directory, f"year={key}.parquet")
+
+
+def read_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST)) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def write_manifest(directory, manifest):
+    path = os.path.join(directory, MANIFEST)
+    tmp_path = "%s.%d.tmp" % (path, os.getpid())
+    with open(tmp_path, "w") as fh:
+        json.dump(manifest, fh, indent=1)
+    os.replace(tmp_path, path)
+
+
+def write_partitions(directory, df):
+    """Write ``df`` one file per year; returns ``{key: rows}``."""
+    os.makedirs(directory, exist_ok=True)
+    written = {}
+    for year, part in df.groupby("year", sort=True, dropna=False, observed=True):
+        key = partition_key(year)
+        path = partition_path(directory, key)
+        tmp_path = "%s.%d.tmp" % (path, os.getpid())
+        pq.write_table(pa.Table.from_pandas(part, preserve_index=False), tmp_path)
+        os.replace(tmp_path, path)
+        written[key] = len(part)
+    return written
+
+
+def read_partitions(directory, keys):
+    """The partitions ``keys`` as one frame, in year order."""
+    frames = [
+        pq.read_table(partition_path(directory, key)).to_pandas()
+        for key in sorted(keys, key=_partition_order)
+    ]
+    return concat_frames(frames)
+
+
+def remove_partitions(directory, keep):
+    """Delete the partition files whose key is not in ``keep``."""
+    for name in os.listdir(directory):
+        if name.startswith("year=") and name.endswith(".parquet"):
+            if name[len("year=") : -len(".parquet")] not in keep:
+                os.remove(os.path.join(directory, name))
+
+
+def concat_frames(frames):
+    """``pd.concat`` that keeps categoricals (union of their categories).
+
+    Partitions written at different times can hold different category
+    sets, which a plain concat would turn into object columns.
+    """
+    frames = list(frames)
+    if len(frames) == 1:
+        return frames[0]
+    for col in frames[0].columns:
+        if not isinstance(frames[0][col].dtype, pd.CategoricalDtype):
+            continue
+        categories = [f[col].cat.categories for f in frames]
+        if all(c.equals(categories[0]) for c in categories[1:]):
+            continue
+        union = pd.Index(sorted(set().union(*categories)))
+        frames = [
+            f.assign(**{col: f[col].cat.set_categories(union)}) for f in frames
+        ]
+    return pd.concat(frames, ignore_index=True)
+
+
+def frame_dtypes(df):
+    return {col: str(dtype) for col, dtype in df.dtypes.items()}
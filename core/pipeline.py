@@ -0,0 +1,455 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from taipy.gui import State, get_state_id
+
+from core.metrics import count_rows
+
+logger = logging.getLogger(__name__)
+
+MAX_SESSIONS = 1000  # per-session records kept (LRU)
+SESSION_TTL_S = float(os.getenv("VM_SESSION_TTL_S", "1800"))  # idle: released
+DATA = "data"  # dep name of the run's data snapshot (see Pipeline.set_data)
+
+
+# ------------------------------------------------------------------
+# NODES
+# ------------------------------------------------------------------
+def _freeze(value):
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class Node:
+    """One step of the derived-data graph.
+
+    ``inputs`` are state variables read by the node, ``deps`` are upstream
+    nodes whose values are passed to ``func`` (state inputs first, then
+    deps, in declaration order); the ``DATA`` dep is the data snapshot
+    the run started with. Nodes with ``outputs`` return a dict of
+    state variables to publish; other nodes return an intermediate value.
+    ``pages`` lists the pages that bind the outputs (None: always needed).
+    A ``key`` node's value is its own signature, so every input form that
+    produces the same canonical value shares downstream results.
+    """
+
+    def __init__(
+        self, name, func, inputs=(), deps=(), outputs=(), pages=None, key=False
+    ):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.deps = tuple(deps)
+        self.outputs = tuple(outputs)
+        self.pages = None if pages is None else tuple(pages)
+        self.key = key
+
+
+# ------------------------------------------------------------------
+# PIPELINE
+# ------------------------------------------------------------------
+class _Session:
+    """What the pipeline keeps per session, trimmed as one LRU entry.
+
+    ``memo`` maps node -> (signature, value, handle), ``generation`` is
+    the number of the session's latest run and ``lock`` serializes its
+    runs; dropping one without the others would let two runs of a live
+    session execute concurrently. A ``closed`` record (dropped, its pins
+    released) no longer memoizes, so a run still holding it pins nothing.
+    """
+
+    def __init__(self):
+        self.memo = {}
+        self.generation = 0
+        self.lock = threading.Lock()
+        self.seen = time.monotonic()  # last run prepared
+        self.closed = False
+
+
+class Pipeline:
+    """Recomputes only the nodes whose inputs changed for a session.
+
+    Only the outputs bound by the active page (and the nodes they depend
+    on) are evaluated; the rest stay deferred until that page is shown.
+    Each node is identified by a signature (its state inputs plus the
+    signatures of its deps). A node whose signature matches the session's
+    last run is skipped; otherwise it is looked up in the shared result
+    cache and computed only on a miss.
+
+    With a cache, a session's memo holds handles (cache keys) rather than
+    values: each handle pins its entry in the cache, so a frame shown to
+    several sessions is held once, and the pins are released when the
+    session moves on to other filters or is dropped. Taipy does not tell
+    the app when a session ends, so a session idle for ``SESSION_TTL_S``
+    is dropped at the next run of any session; without that, abandoned
+    sessions would keep their frames pinned past the cache budget.
+    """
+
+    def __init__(self, nodes, cache=None, metrics=None, max_workers=1, data=None):
+        self.nodes = OrderedDict()
+        for node in nodes:
+            missing = [d for d in node.deps if d not in self.nodes and d != DATA]
+            if missing:
+                raise ValueError(f"Node {node.name!r} declared before {missing}")
+            self.nodes[node.name] = node
+        self.cache = cache
+        self.metrics = metrics  # core.metrics.RollingMetrics (optional)
+        self.executor = None
+        self.set_workers(max_workers)
+        self._sessions = OrderedDict()  # session id -> _Session (LRU)
+        self._lock = threading.Lock()
+        self.data = data  # snapshot passed to the nodes depending on DATA
+        self.data_version = 0  # bumped when the snapshot is replaced
+
+    def set_workers(self, max_workers):
+        """Threads shared by all sessions for node evaluation (1: inline)."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+        self.max_workers = max(1, int(max_workers))
+        self.executor = (
+            ThreadPoolExecutor(self.max_workers, thread_name_prefix="pipeline")
+            if self.max_workers > 1
+            else None
+        )
+
+    @staticmethod
+    def session_id(state):
+        session_id = get_state_id(state) if isinstance(state, State) else None
+        return id(state) if session_id is None else session_id
+
+    def _session_for(self, session_id):
+        """The session's record, marked most recently used.
+
+        Returns ``(session, dropped)``: the records trimmed from the LRU
+        (over ``MAX_SESSIONS`` or idle for ``SESSION_TTL_S``), to be
+        closed by the caller outside the pipeline lock.
+        """
+        now = time.monotonic()
+        dropped = []
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is None:
+                session = _Session()
+            session.seen = now
+            self._sessions[session_id] = session
+            while len(self._sessions) > MAX_SESSIONS or (
+                next(iter(self._sessions.values())).seen < now - SESSION_TTL_S
+            ):
+                dropped.append(self._sessions.popitem(last=False)[1])
+        return session, dropped
+
+    def _close(self, session):
+        """Release a dropped record's pins once its current run is over."""
+        with session.lock:
+            session.closed = True
+            self._release(session.memo)
+
+    def _release(self, memo):
+        """Unpin the cache entries held by a memo and empty it."""
+        for _, _, handle in list(memo.values()):
+            if handle is not None:
+                self.cache.release(handle)
+        memo.clear()
+
+    def _hold(self, session, node, signature, value):
+        """Memoize a node result; returns the (shared) value to use."""
+        if session.closed:
+            return value
+        memo = session.memo
+        previous = memo.get(node.name)
+        if node.key or self.cache is None:
+            memo[node.name] = (signature, value, None)
+        else:
+            handle = ("node", signature)
+            value = self.cache.acquire(handle, value)
+            memo[node.name] = (signature, None, handle)
+        if previous is not None and previous[2] is not None:
+            self.cache.release(previous[2])
+        return value
+
+    def _recall(self, entry):
+        """Value of a memo entry; None if the cache was cleared since."""
+        _, value, handle = entry
+        return value if handle is None else self.cache.peek(handle)
+
+    def drop_session(self, state):
+        """Release everything a session holds (e.g. when it ends)."""
+        with self._lock:
+            session = self._sessions.pop(self.session_id(state), None)
+        if session is not None:
+            self._close(session)
+
+    def session_count(self):
+        with self._lock:
+            return len(self._sessions)
+
+    def set_data(self, data):
+        """Swap in a new data snapshot and drop every result of the old one.
+
+        A run reads the snapshot once, when it is prepared, so all its nodes
+        see the same data even if a swap happens mid-run. The data version
+        is part of every node signature, so memos and cache entries of the
+        old data never match again, even those written by a run that was in
+        flight during the swap. Returns the new version.
+        """
+        with self._lock:
+            self.data = data
+            self.data_version += 1
+            version = self.data_version
+        if self.cache is not None:
+            self.cache.clear()
+        return version
+
+    def _evaluate(self, node, args, signature):
+        """Return ``(value, status, nbytes)``; nbytes of a new result only."""
+        if node.key or self.cache is None:
+            return node.func(*args), "computed", 0
+        cache_key = ("node", signature)
+        value = self.cache.get(cache_key)
+        if value is not None:
+            return value, "cached", 0
+        value = node.func(*args)
+        nbytes = self.cache.put(cache_key, value)
+        return value, "computed", nbytes
+
+    def required_nodes(self, page=None):
+        """Names of the nodes needed to publish the outputs of ``page``.
+
+        ``page=None`` requires every node.
+        """
+        return self._closure(
+            node.name
+            for node in self.nodes.values()
+            if node.outputs
+            and (page is None or node.pages is None or page in node.pages)
+        )
+
+    def _closure(self, names):
+        """``names`` plus every node they depend on."""
+        wanted = list(names)
+        required = set()
+        while wanted:
+            name = wanted.pop()
+            if name not in required and name != DATA:
+                required.add(name)
+                wanted.extend(self.nodes[name].deps)
+        return required
+
+    def prepare(self, state, reason="", page=None, required=None):
+        """Snapshot the state inputs of a run, superseding older runs.
+
+        The returned job can be executed away from the callback thread
+        (see ``execute``); a run prepared later for the same session makes
+        it stale, and a stale job stops at its next node. A job for an
+        explicit ``required`` set of nodes (see ``value``) neither
+        supersedes runs nor goes stale.
+        """
+        supersede = required is None
+        if supersede:
+            required = self.required_nodes(page)
+        names = {var for name in required for var in self.nodes[name].inputs}
+        session, dropped = self._session_for(self.session_id(state))
+        for old in dropped:
+            self._close(old)
+        with self._lock:
+            data, data_version = self.data, self.data_version
+            generation = None
+            if supersede:
+                session.generation += 1
+                generation = session.generation
+        return RunJob(
+            session,
+            generation,
+            required,
+            {var: getattr(state, var) for var in names},
+            reason,
+            page,
+            data,
+            data_version,
+        )
+
+    def is_current(self, job):
+        if job.generation is None:
+            return True
+        return job.session.generation == job.generation
+
+    def run(self, state, reason="", page=None, stats=None, should_stop=None):
+        """Compute and publish the outputs needed by ``page`` in this thread."""
+
+        def publish(outputs):
+            for var, value in outputs.items():
+                setattr(state, var, value)
+
+        job = self.prepare(state, reason, page)
+        return self.execute(job, publish, stats, should_stop)
+
+    def value(self, state, name):
+        """One node's value for the session's current inputs.
+
+        Nothing is published: frames only needed by an action (e.g. a
+        download) are not kept in the session state but resolved here,
+        from the session's memo or the shared cache when they hold them.
+        """
+        job = self.prepare(state, "value", required=self._closure([name]))
+        return self.execute(job, lambda outputs: None)[name]
+
+    def execute(self, job, publish, stats=None, should_stop=None):
+        """Evaluate a prepared job, publishing each node's outputs as it ends.
+
+        ``publish`` receives a ``{state var: value}`` dict per node, so the
+        always-needed nodes declared first (KPIs) reach the page before the
+        heavier frames. When ``stats`` is a dict it receives
+        ``name -> (status, seconds)`` for every evaluated node ("computed",
+        "cached" or "skipped"). The run is abandoned when the job goes
+        stale or ``should_stop`` returns True; nodes already published stay
+        memoized, so the next run only does the rest. Runs of a session are
+        serialized, so a stale run never publishes after a newer one.
+        """
+        with job.session.lock:
+            return self._execute(job, publish, stats, should_stop)
+
+    def _timed_evaluate(self, node, args, signature):
+        t0 = time.perf_counter()
+        value, status, nbytes = self._evaluate(node, args, signature)
+        return value, status, nbytes, time.perf_counter() - t0
+
+    def _execute(self, job, publish, stats, should_stop):
+        """Schedule the required nodes as their deps complete.
+
+        With an executor, independent nodes (e.g. the prod, frac, drill and
+        comp branches) are evaluated concurrently in its threads; pandas and
+        NumPy release the GIL in most kernels. Memo updates and publishing
+        stay on this thread, and ready nodes are started in declaration
+        order, so the KPIs still come first.
+        """
+        memo = job.session.memo
+        signatures = {DATA: (DATA, job.data_version)}
+        values = {DATA: job.data}
+        stages = []
+        skipped = []
+        cancelled = False
+        pending = [node for node in self.nodes.values() if node.name in job.required]
+        running = {}  # future -> (node, signature)
+
+        def finish(node, signature, value, status, nbytes, elapsed):
+            rows_in = count_rows([values[d] for d in node.deps])
+            rows_out = count_rows(value)
+            stages.append(
+                {
+                    "node": node.name,
+                    "status": status,
+                    "ms": round(elapsed * 1000, 2),
+                    "rows_in": rows_in,
+                    "rows_out": rows_out,
+                    "bytes": nbytes,
+                }
+            )
+            if self.metrics is not None and status == "computed":
+                self.metrics.record(
+                    "stage", node.name, elapsed, rows_in, rows_out, nbytes
+                )
+            if stats is not None:
+                stats[node.name] = (status, elapsed)
+            value = self._hold(job.session, node, signature, value)
+            if node.outputs:
+                publish({var: value[var] for var in node.outputs})
+            resolve(node, signature, value)
+
+        def resolve(node, signature, value):
+            values[node.name] = value
+            signatures[node.name] = (node.name, value) if node.key else signature
+
+        while pending or running:
+            if not self.is_current(job) or (should_stop is not None and should_stop()):
+                cancelled = True  # running futures finish into the cache only
+                break
+
+            progressed = False
+            for node in list(pending):
+                if any(d not in values for d in node.deps):
+                    continue
+                pending.remove(node)
+                progressed = True
+                inputs = [job.inputs[var] for var in node.inputs]
+                signature = (
+                    node.name,
+                    job.data_version,
+                    tuple(_freeze(v) for v in inputs),
+                    tuple(signatures[d] for d in node.deps),
+                )
+                previous = memo.get(node.name)
+                if previous is not None and previous[0] == signature:
+                    value = self._recall(previous)
+                    if value is not None:
+                        skipped.append(node.name)
+                        if stats is not None:
+                            stats[node.name] = ("skipped", 0.0)
+                        resolve(node, signature, value)
+                        continue
+
+                args = inputs + [values[d] for d in node.deps]
+                if self.executor is None or node.key:
+                    finish(
+                        node, signature, *self._timed_evaluate(node, args, signature)
+                    )
+                else:
+                    future = self.executor.submit(
+                        self._timed_evaluate, node, args, signature
+                    )
+                    running[future] = (node, signature)
+                break  # rescan from the top: earlier nodes may now be ready
+
+            if progressed:
+                continue
+            if not running:
+                raise RuntimeError(f"Unresolvable nodes: {[n.name for n in pending]}")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in [f for f in running if f in done]:
+                node, signature = running.pop(future)
+                finish(node, signature, *future.result())
+
+        # one JSON object per run, for log aggregation
+        logger.info(
+            json.dumps(
+                {
+                    "event": "pipeline_run",
+                    "reason": job.reason or "full",
+                    "page": job.page or "all",
+                    "stages": stages,
+                    "skipped": skipped,
+                    "deferred": len(self.nodes) - len(job.required),
+                    "cancelled": cancelled,
+                }
+            )
+        )
+        return values
+
+
+class RunJob:
+    """Inputs snapshot of one pipeline run for a session (see ``prepare``)."""
+
+    def __init__(
+        self,
+        session,
+        generation,
+        required,
+        inputs,
+        reason,
+        page,
+        data=None,
+        data_version=0,
+    ):
+        self.session = session
+        self.generation = generation
+        self.required = required
+        self.inputs = inputs
+        self.reason = reason
+        self.page = page
+        self.data = data
+        self.data_version = data_version
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+from core.filter_index import FilterIndex
+
+DIMENSIONS = ("company", "field", "well_type")
+MEASURES = ("oil_prod_m3", "gas_prod_km3")
+
+
+class CumulativeIndex:
+    """Per-well prefix sums of monthly production.
+
+    Rows are visited grouped by well, each well in (year, month) order:
+    ``order`` is that permutation of the stored rows (``WellIndex.order``;
+    rows are stored in ``SORT_KEYS`` order: year, month, well_name,
+    well_id), or None if ``prod`` is already grouped that way. The year
+    ranges below rely on it. Each well is split into segments, the maximal
+    runs of rows with the same company/field/well_type, so a company change
+    mid-life still filters exactly like the row-level data. The volume of a
+    segment over a year range is the difference of two prefix values
+    located by binary search, so a year-range cum costs O(segments), not
+    O(rows).
+    """
+
+    def __init__(self, prod, order=None):
+        self.order = order  # visiting position -> stored row position
+        if order is not None:
+            columns = ["well_id", "year"] + list(DIMENSIONS) + list(MEASURES)
+            prod = prod[columns].take(order)
+        n = len(prod)
+        well_codes = pd.factorize(prod["well_id"])[0]
+        boundary = np.zeros(n, dtype=bool)
+        if n:
+            boundary[0] = True
+            boundary[1:] |= well_codes[1:] != well_codes[:-1]
+            for dim in DIMENSIONS:
+                codes = pd.factorize(prod[dim])[0]
+                boundary[1:] |= codes[1:] != codes[:-1]
+
+        starts = np.flatnonzero(boundary)
+        segment_of_row = np.cumsum(boundary) - 1
+        self.segments = prod.iloc[starts][["well_id"] + list(DIMENSIONS)].reset_index(
+            drop=True
+        )
+        self.segment_index = FilterIndex(self.segments, DIMENSIONS)
+
+        # rows are (segment, year)-sorted: one composite key searches them all
+        years = prod["year"].to_numpy().astype(np.int64)
+        self.year_min = int(years.min()) if n else 0
+        self.year_max = int(years.max()) if n else 0
+        self.year_span = self.year_max - self.year_min + 1
+        self.row_keys = segment_of_row.astype(np.int64) * self.year_span + (
+            years - self.year_min
+        )
+
+        self.prefix = {
+            col: np.concatenate(
+                ([0.0], np.cumsum(prod[col].astype("float64").fillna(0).to_numpy()))
+            )
+            for col in MEASURES
+        }
+
+    def _segment_rows(self, selections, year_range):
+        """Selected segments with rows in the range, and those rows' bounds.
+
+        Returns ``(segments, first, last)``: row ``first:last`` (visiting
+        order) of each segment falls in the year range.
+        """
+        lo = max(int(year_range[0]), self.year_min)
+        hi = min(int(year_range[1]), self.year_max)
+        segments = self.segment_index.select(selections)
+        if segments is None:
+            segments = np.arange(len(self.segments))
+        if lo > hi or len(segments) == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, empty
+
+        base = segments.astype(np.int64) * self.year_span
+        first = np.searchsorted(self.row_keys, base + (lo - self.year_min), "left")
+        last = np.searchsorted(self.row_keys, base + (hi - self.year_min), "right")
+        has_rows = last > first
+        return segments[has_rows], first[has_rows], last[has_rows]
+
+    def cumulative(self, selections, year_range):
+        """Per-well volumes over the filters, like a groupby-sum of the rows.
+
+        Returns ``well_id`` plus one column per measure, for the wells with
+        at least one row in the selection.
+        """
+        segments, first, last = self._segment_rows(selections, year_range)
+        if len(segments) == 0:
+            return pd.DataFrame(columns=["well_id"] + list(MEASURES))
+
+        out = pd.DataFrame({"well_id": self.segments["well_id"].to_numpy()[segments]})
+        for col in MEASURES:
+            prefix = self.prefix[col]
+            out[col] = prefix[last] - prefix[first]
+        return out.groupby("well_id", as_index=False, sort=False)[list(MEASURES)].sum()
+
+    def latest_rows(self, selections, year_range):
+        """Stored position of each well's latest row within the filters.
+
+        The last row of every selected segment, then the latest one per
+        well: rows are stored (year, month)-major (``SORT_KEYS``), so that
+        is the largest position. Ascending, i.e. the rows a ``drop_duplicates("well_id",
+        keep="last")`` of the filtered rows keeps, found in O(segments).
+        """
+        return self.latest_segments(selections, year_range)[0]
+
+    def latest_segments(self, selections, year_range):
+        """``(rows, segments)``: ``latest_rows`` and the segment of each.
+
+        The segment carries the company/field the well had at that row,
+        which can differ from its latest record over all years.
+        """
+        segments, _, last = self._segment_rows(selections, year_range)
+        if len(segments) == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+
+        rows = last - 1
+        if self.order is not None:
+            rows = self.order[rows]
+        well_ids = self.segments["well_id"].to_numpy()[segments]
+        latest = pd.Series(rows).groupby(well_ids, sort=False).idxmax().to_numpy()
+        latest = latest[np.argsort(rows[latest])]
+        return rows[latest], segments[latest]
@@ -0,0 +1,83 @@
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------
+# CONFIG
+# ------------------------------------------------------------------
+RELOAD_INTERVAL_S = float(os.getenv("VM_RELOAD_INTERVAL_S", "60"))  # 0: off
+
+
+# ------------------------------------------------------------------
+# WATCHER
+# ------------------------------------------------------------------
+def files_signature(paths):
+    """(size, mtime_ns) per path; None for a missing file."""
+    signature = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+            signature[path] = (st.st_size, st.st_mtime_ns)
+        except OSError:
+            signature[path] = None
+    return signature
+
+
+class DataWatcher:
+    """Polls the dataset files and calls ``reload()`` once they settle.
+
+    A change is acted on only when two consecutive polls see the same
+    sizes and mtimes, so a file still being copied in is never loaded.
+    If ``reload`` raises (e.g. the new files fail validation) the error is
+    logged and the same files are not retried until they change again.
+    Polling needs no extra dependency and works on bind mounts where
+    inotify events are not delivered.
+    """
+
+    def __init__(self, paths, reload, interval_s=RELOAD_INTERVAL_S):
+        self.paths = list(paths)
+        self.reload = reload
+        self.interval_s = interval_s
+        self._loaded = files_signature(self.paths)  # files behind the live data
+        self._seen = self._loaded  # result of the previous poll
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.interval_s <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._loop, name="data-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.check()
+            except Exception:  # keep watching after an unexpected failure
+                logger.exception("Data watcher poll failed")
+
+    def check(self):
+        """One poll; returns True when a reload was attempted."""
+        current = files_signature(self.paths)
+        settled = current == self._seen
+        self._seen = current
+        if not settled or current == self._loaded:
+            return False
+        if any(sig is None for sig in current.values()):
+            logger.warning("Data reload skipped: missing files %s", current)
+            return False
+
+        self._loaded = current
+        try:
+            self.reload()
+        except Exception:
+            logger.exception("Data reload failed; still serving the previous data")
+        return True
@@ -0,0 +1,165 @@
+import logging
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from core.selection import RowSelection
+from core.table_pager import TablePager
+
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------
+# SIZING
+# ------------------------------------------------------------------
+def estimate_bytes(value):
+    """Approximate memory held by a cached value (frames dominate)."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (RowSelection, TablePager)):
+        return value.nbytes  # row ids only: the base frame is shared
+    if isinstance(value, dict):
+        return sum(estimate_bytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_bytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+# ------------------------------------------------------------------
+# SHARED STORE
+# ------------------------------------------------------------------
+class ResultCache:
+    """Process-wide store of derived results, each held once.
+
+    Values are shared between sessions and must be treated as read-only.
+    Sessions hold keys, not values: ``acquire`` pins an entry for one more
+    holder and ``release`` unpins it. A pinned entry is never evicted (a
+    session still shows it, so dropping it would free nothing and the next
+    session with the same filters would compute a second copy). Unpinned
+    entries are an LRU trimmed to ``max_bytes``, counting pinned ones.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> [value, nbytes, holders]
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def peek(self, key):
+        """The value under ``key`` (None if absent), not counted as a lookup."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None else entry[0]
+
+    def put(self, key, value):
+        """Store ``value`` and return its estimated size in bytes."""
+        nbytes = estimate_bytes(value)
+        if nbytes > self.max_bytes:
+            logger.debug("Not caching %r (%d bytes > budget)", key, nbytes)
+            return nbytes
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            holders = old[2] if old is not None else 0
+            self._entries[key] = [value, nbytes, holders]
+            self.current_bytes += nbytes
+            self._evict()
+        self._track(key, value)
+        return nbytes
+
+    def acquire(self, key, value):
+        """Pin ``key`` for one more holder and return the shared value.
+
+        ``value`` is stored if the key is absent (whatever its size: it is
+        alive anyway); if present, the stored value is returned instead so
+        concurrent computations of a key converge on one object.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            stored = entry is None
+            if stored:
+                nbytes = estimate_bytes(value)
+                entry = self._entries[key] = [value, nbytes, 0]
+                self.current_bytes += nbytes
+            entry[2] += 1
+            self._entries.move_to_end(key)
+        if stored:
+            self._track(key, value)
+        return entry[0]
+
+    def _track(self, key, value):
+        """Re-account values that grow after being stored (table pagers)."""
+        if isinstance(value, TablePager):
+            value.on_resize = lambda: self.resize(key)
+
+    def resize(self, key):
+        """Re-estimate the size of ``key``'s value and trim to budget."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            nbytes = estimate_bytes(entry[0])
+            self.current_bytes += nbytes - entry[1]
+            entry[1] = nbytes
+            self._evict()
+
+    def release(self, key):
+        """Unpin ``key``; it stays cached until evicted. Unknown keys (e.g.
+        after ``clear``) are ignored."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] == 0:
+                return
+            entry[2] -= 1
+            if entry[2] == 0:
+                self._evict()
+
+    def _evict(self):
+        """Drop least recently used unpinned entries while over budget."""
+        if self.current_bytes <= self.max_bytes:
+            return
+        for key in [k for k, e in self._entries.items() if e[2] == 0]:
+            _, nbytes, _ = self._entries.pop(key)
+            self.current_bytes -= nbytes
+            self.evictions += 1
+            if self.current_bytes <= self.max_bytes:
+                return
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            pinned = [e for e in self._entries.values() if e[2]]
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "pinned": len(pinned),
+                "pinned_bytes": sum(e[1] for e in pinned),
+                "holders": sum(e[2] for e in pinned),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
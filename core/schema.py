@@ -0,0 +1,243 @@
+import logging
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------
+# DECLARED SCHEMAS
+# ------------------------------------------------------------------
+# Relative tolerance accepted on column totals/means after downcasting.
+# At most a one-unit change in the last displayed decimal of the volume
+# KPIs (e.g. total_proppant 39897.54 -> 39897.53). float32 columns that
+# would exceed it are kept as float64.
+KPI_REL_TOLERANCE = 1e-6
+
+# Dimension columns: repeated strings -> categoricals
+CATEGORY_COLUMNS = [
+    "company",
+    "field",
+    "well_type",
+    "well_name",
+    "basin",
+    "location",
+    "concept",
+]
+
+# Date columns per dataset (parsed once at load)
+DATE_COLUMNS = {
+    "frac": ["frac_start_date", "frac_end_date"],
+    "drill": ["date_data"],
+}
+
+# Narrow numeric types per dataset. Coordinates stay float64 (UTM metres
+# would lose sub-metre precision as float32), and so do drilled meters
+# (drilled_meters is shown to the centimetre on totals of ~10^7).
+NUMERIC_DTYPES = {
+    "prod": {
+        "well_id": "int32",
+        "year": "int16",
+        "month": "int8",
+        "oil_prod_m3": "float32",
+        "gas_prod_km3": "float32",
+        "water_prod_m3": "float32",
+        "oil_cum_m3": "float32",
+        "gas_cum_km3": "float32",
+        "depth": "float32",
+    },
+    "frac": {
+        "well_id": "int32",
+        "year": "int16",
+        "month": "int8",
+        "lateral_length_ft": "float32",
+        "number_stages": "int16",
+        "proppant_pumped_lb": "float32",
+        "fluid_pumped_bbl": "float32",
+        "maximum_pressure_psi": "float32",
+        "horse_power_hp": "float32",
+    },
+    "drill": {
+        "year": "int16",
+        "month": "int8",
+        "wells": "float32",
+    },
+    "comp": {
+        "year": "int16",
+        "month": "int8",
+        "completion": "float32",
+    },
+}
+
+
+# Physical row order: by year, then month, so a year range is one
+# contiguous slice located by binary search (core/filter_index.py), and the
+# rows of a year are exactly one partition of the store (core/partitions.py).
+# A well's history is gathered through the permutation kept by
+# core/well_index.py. Ordered by year/month rather than `date`, which is
+# NaT for some months.
+SORT_KEYS = {
+    "prod": ["year", "month", "well_name", "well_id"],
+    "frac": ["year", "month", "well_name", "well_id"],
+    "drill": ["year", "month"],
+    "comp": ["year", "month"],
+}
+
+
+# Columns the dashboard reads per dataset. A reloaded file missing any of
+# them is rejected and the previous data keeps being served.
+REQUIRED_COLUMNS = {
+    "prod": [
+        "well_id",
+        "well_name",
+        "company",
+        "field",
+        "well_type",
+        "year",
+        "month",
+        "oil_prod_m3",
+        "gas_prod_km3",
+        "water_prod_m3",
+        "oil_cum_m3",
+        "gas_cum_km3",
+        "depth",
+        "Xcoor",
+        "Ycoor",
+    ],
+    "frac": [
+        "well_id",
+        "well_name",
+        "company",
+        "field",
+        "lateral_length_ft",
+        "number_stages",
+        "proppant_pumped_lb",
+        "fluid_pumped_bbl",
+    ],
+    "drill": ["company", "field", "year", "wells", "meters"],
+    "comp": ["company", "field", "year"],
+}
+
+
+# ------------------------------------------------------------------
+# APPLY
+# ------------------------------------------------------------------
+def _within_tolerance(raw, compact):
+    raw = raw.dropna()
+    if raw.empty:
+        return True
+    for ref, val in (
+        (float(raw.sum()), float(compact.sum())),
+        (float(raw.mean()), float(compact.mean())),
+    ):
+        if abs(ref - val) > KPI_REL_TOLERANCE * max(abs(ref), 1.0):
+            return False
+    return True
+
+
+def _cast_numeric(df, col, dtype):
+    src = df[col]
+    if src.dtype == dtype:
+        return
+    if dtype.startswith("int"):
+        if src.isna().any():
+            return  # plain numpy ints cannot hold NaN
+        narrowed = pd.to_numeric(src, errors="coerce")
+        if (narrowed != narrowed.astype(dtype)).any():
+            logger.warning("%s does not fit in %s, keeping %s", col, dtype, src.dtype)
+            return
+        df[col] = narrowed.astype(dtype)
+    else:
+        narrowed = src.astype(dtype)
+        if not _within_tolerance(src, narrowed):
+            logger.warning("%s exceeds KPI tolerance as %s, keeping %s", col, dtype, src.dtype)
+            return
+        df[col] = narrowed
+
+
+def apply_schema(name, df):
+    """Parse dates, declare categoricals, narrow numerics and order rows."""
+    for col in DATE_COLUMNS.get(name, []):
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+
+    # production: month-end date from year/month
+    if name == "prod":
+        df["date"] = pd.to_datetime(
+            pd.DataFrame({"year": df["year"], "month": df["month"], "day": 31}),
+            errors="coerce",
+        )
+
+    for col, dtype in NUMERIC_DTYPES.get(name, {}).items():
+        if col in df.columns:
+            _cast_numeric(df, col, dtype)
+
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+
+    # frac: stimulation intensities per lateral foot, derived once here
+    # rather than on every filtered copy
+    if name == "frac" and "lateral_length_ft" in df.columns:
+        lateral = df["lateral_length_ft"].replace(0, pd.NA)  # avoid division by zero
+        df["proppant_intensity_lbft"] = df["proppant_pumped_lb"] / lateral
+        df["fluid_intensity_bblft"] = df["fluid_pumped_bbl"] / lateral
+
+    return sort_rows(name, df)
+
+
+def sort_rows(name, df):
+    """Rows in the physical order of ``SORT_KEYS``, with a fresh index."""
+    sort_keys = [col for col in SORT_KEYS.get(name, []) if col in df.columns]
+    if sort_keys:
+        df = df.sort_values(sort_keys, kind="stable").reset_index(drop=True)
+    return df
+
+
+def validate_dataset(name, df):
+    """Raise ValueError if a typed dataset cannot back the dashboard."""
+    if df.empty:
+        raise ValueError(f"{name}: no rows")
+    missing = [col for col in REQUIRED_COLUMNS.get(name, []) if col not in df.columns]
+    if missing:
+        raise ValueError(f"{name}: missing columns {missing}")
+    if "year" in df.columns and not pd.api.types.is_numeric_dtype(df["year"]):
+        raise ValueError(f"{name}: non-numeric year column ({df['year'].dtype})")
+
+
+# ------------------------------------------------------------------
+# REPORTING
+# ------------------------------------------------------------------
+def frame_memory(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def memory_report(name, before, after):
+    """One-line before/after summary; ``before``/``after`` are byte counts."""
+    ratio = before / after if after else 0.0
+    return "%s: %.1f MB -> %.1f MB (%.1fx)" % (name, before / 1e6, after / 1e6, ratio)
+
+
+def kpi_drift(raw, compact):
+    """Relative drift of every numeric column total between two frames."""
+    drift = {}
+    for col in raw.columns:
+        if col not in compact.columns or not pd.api.types.is_numeric_dtype(raw[col]):
+            continue
+        ref = float(raw[col].sum())
+        val = float(compact[col].sum())
+        drift[col] = abs(ref - val) / max(abs(ref), 1.0)
+    return drift
+
+
+if __name__ == "__main__":
+    # python -m core.schema data/well_prod_data.csv prod
+    import sys
+
+    path, name = sys.argv[1], sys.argv[2]
+    raw = pd.read_csv(path)
+    compact = apply_schema(name, raw.copy())
+    print(memory_report(name, frame_memory(raw), frame_memory(compact)))
+    for col, rel in sorted(kpi_drift(raw, compact).items()):
+        status = "ok" if rel <= KPI_REL_TOLERANCE else "OVER"
+        print("  %-24s %.2e %s" % (col, rel, status))
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+
+class RowSelection:
+    """Rows of an immutable base frame, gathered only when read.
+
+    ``rows`` is a slice (a year range of year-ordered data, see
+    core/filter_index.py) or ascending row positions. Nothing is copied
+    when the selection is made: a consumer reading two columns gathers
+    those two, a table page gathers its hundred rows, and the full frame
+    is only materialized on demand (``frame``, e.g. for a download).
+
+    Supports the read-only part of the DataFrame API the table pager and
+    the exporter use: ``len``, ``empty``, ``columns``, ``df[column]``,
+    ``take``, ``head`` and ``iloc[start:stop]``.
+    """
+
+    def __init__(self, df, rows):
+        self.df = df
+        self.rows = rows
+
+    def __len__(self):
+        if isinstance(self.rows, slice):
+            return self.rows.stop - self.rows.start
+        return len(self.rows)
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    @property
+    def columns(self):
+        return self.df.columns
+
+    @property
+    def nbytes(self):
+        """Bytes held by the selection itself (the base frame is shared)."""
+        return 0 if isinstance(self.rows, slice) else int(self.rows.nbytes)
+
+    def _base_positions(self, positions):
+        positions = np.asarray(positions, dtype=np.int64)
+        if isinstance(self.rows, slice):
+            return positions + self.rows.start
+        return self.rows[positions]
+
+    def __getitem__(self, column):
+        """One column of the selection as a Series (base index labels)."""
+        values = self.df[column]
+        if isinstance(self.rows, slice):
+            return values.iloc[self.rows]
+        return values.take(self.rows)
+
+    def frame(self, columns=None):
+        """The selection as a DataFrame, optionally just ``columns``.
+
+        ``columns`` are gathered one by one: ``df.iloc[rows, columns]``
+        would copy the full columns before selecting rows. A slice
+        selection's columns are views of the base frame, so treat the
+        result as read-only.
+        """
+        if columns is None:
+            return self.df.iloc[self.rows]
+        return pd.DataFrame(
+            {col: self[col].array for col in columns},
+            index=self.df.index[self.rows],
+            copy=False,
+        )
+
+    def take(self, positions):
+        """Rows at ``positions`` of the selection, as a DataFrame."""
+        return self.df.take(self._base_positions(positions))
+
+    def head(self, n=5):
+        return self.take(np.arange(min(n, len(self))))
+
+    @property
+    def iloc(self):
+        return _RowSlicer(self)
+
+
+class _RowSlicer:
+    def __init__(self, selection):
+        self.selection = selection
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            raise TypeError("RowSelection.iloc supports row slices only")
+        start, stop, step = key.indices(len(self.selection))
+        return self.selection.take(np.arange(start, stop, step))
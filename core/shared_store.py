@@ -0,0 +1,78 @@
+import json
+import logging
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # shared mode needs pyarrow; private frames otherwise
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------
+# CONFIG
+# ------------------------------------------------------------------
+SHARED_DIR = os.getenv("VM_SHARED_DIR", "data/.shared")
+SHARED_FORMAT = 2  # bump whenever publish_frame changes the file layout
+
+
+# ------------------------------------------------------------------
+# ARROW IPC FILES
+# ------------------------------------------------------------------
+# A dataset is stored as one uncompressed, single-batch Arrow IPC file.
+# Mapping it gives pandas columns that are views of the file's pages, so
+# every process serving the app shares one copy in the OS page cache.
+# Arrow nulls would make pandas copy a column to fill them in, so float
+# and timestamp columns are written with their NaN/NaT kept as values.
+def shared_path_for(name, directory=SHARED_DIR):
+    return os.path.join(directory, name + ".arrow")
+
+
+def _without_nulls(values):
+    """Arrow array of a float/datetime64 column with NaN/NaT as values, or None."""
+    if pd.api.types.is_datetime64_dtype(values):
+        ticks = values.to_numpy(dtype="datetime64[ns]").view("int64")
+        return pa.array(ticks, from_pandas=False).view(pa.timestamp("ns"))
+    if pd.api.types.is_float_dtype(values):
+        return pa.array(values.to_numpy(), from_pandas=False)
+    return None
+
+
+def publish_frame(df, path, signature):
+    """Write ``df`` for zero-copy mapping (write-then-rename)."""
+    table = pa.Table.from_pandas(df, preserve_index=False).combine_chunks()
+    for i, col in enumerate(df.columns):
+        array = _without_nulls(df[col])
+        if array is not None:
+            table = table.set_column(i, table.field(i).with_type(array.type), array)
+    meta = dict(table.schema.metadata or {})
+    meta[b"vm_source"] = json.dumps(signature).encode("utf-8")
+    meta[b"vm_format"] = str(SHARED_FORMAT).encode("utf-8")
+    table = table.replace_schema_metadata(meta)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = "%s.%d.tmp" % (path, os.getpid())  # workers may race here
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=max(1, len(table)))
+    os.replace(tmp_path, path)
+
+
+def map_frame(path, signature):
+    """Memory-map a published frame, or None if missing/stale."""
+    if pa is None or not os.path.exists(path):
+        return None
+    try:
+        reader = pa.ipc.open_file(pa.memory_map(path, "r"))
+        meta = reader.schema.metadata or {}
+        if meta.get(b"vm_format") != str(SHARED_FORMAT).encode("utf-8"):
+            return None
+        if json.loads(meta.get(b"vm_source", b"{}")) != signature:
+            return None
+        return reader.read_all().to_pandas(split_blocks=True)
+    except Exception as exc:  # partial/corrupt file: rebuild it
+        logger.warning("Ignoring unreadable shared frame %s: %s", path, exc)
+        return None
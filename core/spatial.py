@@ -0,0 +1,187 @@
+import numpy as np
+import pandas as pd
+
+# ------------------------------------------------------------------
+# CONFIG
+# ------------------------------------------------------------------
+MAX_LEVEL = 16  # finest quadtree level (2^16 cells per side)
+CLUSTER_CELLS = 48  # target clusters across the visible width
+VIEW_PADDING = 0.5  # fraction of the view served around it (smooth panning)
+
+
+# ------------------------------------------------------------------
+# QUADTREE KEYS
+# ------------------------------------------------------------------
+def _spread_bits(v):
+    v = v.astype(np.uint64)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x00FF00FF)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x0F0F0F0F)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x33333333)
+    v = (v | (v << np.uint64(1))) & np.uint64(0x55555555)
+    return v
+
+
+class WellGrid:
+    """Quadtree over well coordinates, stored as per-well Morton keys.
+
+    The key of a well at level ``L`` is its finest key shifted right by
+    ``2 * (MAX_LEVEL - L)`` bits, so grouping wells by shifted keys gives
+    the cells of any level without rebuilding anything.
+    """
+
+    def __init__(self, x, y):
+        x = np.asarray(x, dtype="float64")
+        y = np.asarray(y, dtype="float64")
+        finite = np.isfinite(x) & np.isfinite(y)
+        if finite.any():
+            self.x0, self.y0 = x[finite].min(), y[finite].min()
+            self.extent = max(np.ptp(x[finite]), np.ptp(y[finite])) or 1.0
+        else:
+            self.x0, self.y0, self.extent = 0.0, 0.0, 1.0
+
+    def keys(self, x, y):
+        """Finest-level Morton keys for coordinate arrays (NaN -> cell 0)."""
+        side = 2**MAX_LEVEL
+        ix = np.nan_to_num((np.asarray(x, dtype="float64") - self.x0) / self.extent)
+        iy = np.nan_to_num((np.asarray(y, dtype="float64") - self.y0) / self.extent)
+        ix = np.clip((ix * side).astype(np.int64), 0, side - 1)
+        iy = np.clip((iy * side).astype(np.int64), 0, side - 1)
+        return _spread_bits(ix) | (_spread_bits(iy) << np.uint64(1))
+
+    def cell_size(self, level):
+        return self.extent / 2**level
+
+    def level_for_width(self, width):
+        """Level whose cells are ~1/CLUSTER_CELLS of the visible width."""
+        if not width or width <= 0:
+            width = self.extent
+        level = int(np.floor(np.log2(self.extent * CLUSTER_CELLS / width)))
+        return int(np.clip(level, 0, MAX_LEVEL))
+
+    def snap_view(self, x_range, y_range):
+        """Padded view snapped to the cell grid of its level.
+
+        Small pans inside one cell map to the same view, so map results can
+        be shared through the result cache.
+        """
+        (xa, xb), (ya, yb) = sorted(x_range), sorted(y_range)
+        level = self.level_for_width(xb - xa)
+        size = self.cell_size(level)
+        pad_x, pad_y = (xb - xa) * VIEW_PADDING, (yb - ya) * VIEW_PADDING
+
+        def snap(lo, hi, origin):
+            lo = origin + np.floor((lo - origin) / size) * size
+            hi = origin + np.ceil((hi - origin) / size) * size
+            return float(lo), float(hi)
+
+        return (
+            snap(xa - pad_x, xb + pad_x, self.x0),
+            snap(ya - pad_y, yb + pad_y, self.y0),
+            level,
+        )
+
+
+# ------------------------------------------------------------------
+# LEVEL OF DETAIL
+# ------------------------------------------------------------------
+def crop_to_view(wells, view):
+    """Wells inside a snapped view (``None``: everything)."""
+    if view is None:
+        return wells
+    (xa, xb), (ya, yb), _ = view
+    x, y = wells["Xcoor"].to_numpy(), wells["Ycoor"].to_numpy()
+    return wells[(x >= xa) & (x <= xb) & (y >= ya) & (y <= yb)]
+
+
+def cluster_wells(wells, level):
+    """Aggregate wells (with a ``grid_key`` column) into level-``level`` cells.
+
+    Clusters sit at the centroid of their wells and carry the well count and
+    the summed cumulative volumes.
+    """
+    shift = np.uint64(2 * (MAX_LEVEL - level))
+    cell = wells["grid_key"].to_numpy() >> shift
+    grouped = wells.groupby(cell, sort=False)
+    clusters = grouped.agg(
+        Xcoor=("Xcoor", "mean"),
+        Ycoor=("Ycoor", "mean"),
+        oil_cum_m3=("oil_cum_m3", "sum"),
+        gas_cum_km3=("gas_cum_km3", "sum"),
+        n_wells=("well_id", "size"),
+    )
+    return clusters.reset_index(drop=True)
+
+
+def level_of_detail(grid, wells, view, max_markers):
+    """Individual wells when few enough are visible, else quadtree clusters.
+
+    Returns ``(frame, clustered)``; the level starts at the one matching the
+    view width and is coarsened until at most ``max_markers`` remain.
+    """
+    visible = crop_to_view(wells, view)
+    if len(visible) <= max_markers:
+        return visible, False
+
+    level = view[2] if view is not None else grid.level_for_width(grid.extent)
+    clusters = cluster_wells(visible, level)
+    while len(clusters) > max_markers and level > 0:
+        level -= 1
+        clusters = cluster_wells(visible, level)
+    return clusters, True
+
+
+def bubble_scale(values):
+    """Value at which bubbles reach full size: the 95th percentile."""
+    values = np.nan_to_num(np.asarray(values, dtype="float64"))
+    scale = float(np.quantile(values, 0.95)) if len(values) else 0.0
+    return scale if scale > 0 else 1.0
+
+
+def bubble_sizes(values, scale=None):
+    """4-40 px bubble sizes saturating at ``scale`` (default: the 95th
+    percentile of ``values``)."""
+    values = np.nan_to_num(np.asarray(values, dtype="float64"))
+    if scale is None:
+        scale = bubble_scale(values)
+    return 4 + 36 * np.clip(values, None, scale) / scale
+
+
+# ------------------------------------------------------------------
+# PER-WELL PRESENTATION
+# ------------------------------------------------------------------
+class WellPresentation:
+    """Filter-independent map columns of every well, built once at load.
+
+    One row per well (its latest record), sorted by ``well_id``: the
+    quadtree key, and for each size column the value its bubbles saturate
+    at over all wells. The hover fragment (name, company, field) is kept
+    per segment of ``segments`` (``CumulativeIndex.segments``): a well
+    that changed operator shows the company/field of the segment its
+    filtered latest row belongs to. A map refresh gathers these and only
+    formats the metric value; a bubble size stands for the same volume
+    whatever the filters.
+    """
+
+    def __init__(self, wells, grid, segments, size_columns=()):
+        wells = wells.sort_values("well_id", kind="stable")
+        self.well_ids = wells["well_id"].to_numpy()
+        names = wells["well_name"].astype(str).to_numpy()
+        at = self.positions(segments["well_id"])
+        self.hover = (
+            "Well: "
+            + pd.Series(names[at])
+            + "<br>Company: "
+            + segments["company"].astype(str)
+            + "<br>Field: "
+            + segments["field"].astype(str)
+            + "<br>"
+        ).to_numpy()
+        self.grid_keys = grid.keys(wells["Xcoor"], wells["Ycoor"])
+        self.scales = {col: bubble_scale(wells[col]) for col in size_columns}
+
+    def positions(self, well_ids):
+        """Table row of each (known) well id."""
+        return np.searchsorted(self.well_ids, np.asarray(well_ids))
+
+    def sizes(self, column, values):
+        return bubble_sizes(values, self.scales[column])
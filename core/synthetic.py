@@ -0,0 +1,258 @@
+import argparse
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------
+# CONFIG (distributions measured on the real CSV's at scale 1)
+# ------------------------------------------------------------------
+BASE_WELLS = 2100  # production/frac wells at scale 1
+FIRST_YEAR, LAST_YEAR = 2009, 2025  # drilling/completion reporting window
+FIRST_PROD_YEAR = 2011
+END_DATE = (2025, 6)  # last production month
+
+WELL_TYPES = {"Petrolífero": 0.59, "Gasífero": 0.36, "Otro tipo": 0.05}
+DRILL_CONCEPTS = ["Exploración", "Avanzada", "Explotación"]
+BASIN, LOCATION = "NEUQUINA", "On Shore"
+
+# fallback company/field pool when data/well_frac_data.csv is absent
+DEFAULT_PAIRS = [
+    (f"COMPANY {c:02d}", f"FIELD {c:02d}-{f}") for c in range(1, 16) for f in "ABCD"
+]
+
+BATCH_WELLS = 20_000  # production rows are written in batches of wells
+
+
+# ------------------------------------------------------------------
+# TEMPLATE
+# ------------------------------------------------------------------
+def company_fields(template_path, scale, rng):
+    """(company, field) pairs and well weights, replicated with ``scale``.
+
+    Pairs and their well shares come from the real frac file when it is
+    available; replicas of a field get a numbered suffix.
+    """
+    if template_path and os.path.exists(template_path):
+        frac = pd.read_csv(template_path, usecols=["company", "field"])
+        counts = frac.value_counts(["company", "field"])
+        pairs = list(counts.index)
+        weights = counts.to_numpy(dtype="float64")
+    else:
+        pairs = DEFAULT_PAIRS
+        weights = rng.gamma(0.6, size=len(pairs))
+
+    replicas = max(1, int(np.ceil(scale)))
+    pairs = [
+        (company, field if r == 0 else f"{field} {r + 1}")
+        for r in range(replicas)
+        for company, field in pairs
+    ]
+    weights = np.tile(weights, replicas)
+    return pd.DataFrame(pairs, columns=["company", "field"]), weights / weights.sum()
+
+
+def _months(year, month):
+    return year * 12 + month - 1
+
+
+# ------------------------------------------------------------------
+# WELLS
+# ------------------------------------------------------------------
+def make_wells(pairs, weights, n_wells, rng):
+    pick = rng.choice(len(pairs), size=n_wells, p=weights)
+    wells = pairs.iloc[pick].reset_index(drop=True)
+
+    # field centroids inside the real coordinate envelope
+    cx = rng.uniform(2.36e6, 2.54e6, size=len(pairs))
+    cy = rng.uniform(5.66e6, 5.84e6, size=len(pairs))
+    wells["Xcoor"] = cx[pick] + rng.normal(0, 4000, n_wells)
+    wells["Ycoor"] = cy[pick] + rng.normal(0, 4000, n_wells)
+
+    wells["well_id"] = np.arange(137_000, 137_000 + n_wells)
+    prefix = wells["company"].str.split().str[0].str.replace(".", "", regex=False)
+    wells["well_name"] = (
+        prefix + ".Nq." + wells["well_id"].astype(str) + "(h)"
+    ).to_numpy()
+    wells["well_type"] = rng.choice(
+        list(WELL_TYPES), size=n_wells, p=list(WELL_TYPES.values())
+    )
+
+    year = np.clip(np.rint(rng.normal(2021, 3, n_wells)), FIRST_PROD_YEAR, END_DATE[0])
+    wells["start"] = _months(year.astype(int), rng.integers(1, 13, n_wells))
+    wells["start"] = np.minimum(wells["start"], _months(*END_DATE))
+    wells["depth"] = np.round(rng.normal(8980, 790, n_wells), 1)
+    wells["lateral_length_ft"] = np.clip(rng.normal(8000, 2380, n_wells), 1500, 16300)
+    return wells
+
+
+# ------------------------------------------------------------------
+# DATASETS
+# ------------------------------------------------------------------
+def make_frac(wells, rng):
+    n = len(wells)
+    start = pd.to_datetime(
+        {
+            "year": wells["start"] // 12,
+            "month": wells["start"] % 12 + 1,
+            "day": rng.integers(1, 29, n),
+        }
+    )
+    lateral = wells["lateral_length_ft"].to_numpy()
+    return pd.DataFrame(
+        {
+            "well_id": wells["well_id"],
+            "month": start.dt.month,
+            "year": start.dt.year,
+            "well_name": wells["well_name"],
+            "company": wells["company"],
+            "field": wells["field"],
+            "frac_start_date": start.dt.date,
+            "frac_end_date": (
+                start + pd.to_timedelta(rng.integers(5, 45, n), "D")
+            ).dt.date,
+            "lateral_length_ft": lateral.round(4),
+            "number_stages": np.clip(
+                np.rint(lateral / 210 + rng.normal(0, 5, n)), 1, 99
+            ).astype(int),
+            "proppant_pumped_lb": (lateral * 2400 * rng.lognormal(0, 0.25, n)).round(4),
+            "fluid_pumped_bbl": (lateral * 44 * rng.lognormal(0, 0.35, n)).round(4),
+            "maximum_pressure_psi": np.clip(
+                rng.normal(11800, 2000, n), 3000, None
+            ).round(1),
+            "horse_power_hp": np.clip(rng.normal(31000, 8000, n), 5000, None).round(1),
+        }
+    )
+
+
+def make_prod(wells, rng):
+    """Monthly hyperbolic-decline production from each well's first month."""
+    n_months = _months(*END_DATE) - wells["start"].to_numpy() + 1
+    row_well = np.repeat(np.arange(len(wells)), n_months)
+    age = np.arange(len(row_well)) - np.repeat(np.cumsum(n_months) - n_months, n_months)
+    month_idx = wells["start"].to_numpy()[row_well] + age
+
+    well_type = wells["well_type"].to_numpy()
+    oil_qi = np.where(
+        well_type == "Petrolífero", rng.lognormal(8.3, 0.5, len(wells)), 0.0
+    )
+    gas_qi = np.where(
+        well_type == "Gasífero",
+        rng.lognormal(7.8, 0.4, len(wells)),
+        oil_qi * rng.lognormal(0.0, 0.3, len(wells)),
+    )
+    decline = (1 + 1.1 * 0.12 * age) ** (-1 / 1.1)
+    noise = rng.lognormal(0, 0.15, len(row_well))
+
+    prod = wells.iloc[row_well][
+        ["well_id", "well_name", "company", "field", "well_type"]
+    ].reset_index(drop=True)
+    prod["year"] = month_idx // 12
+    prod["month"] = month_idx % 12 + 1
+    prod["oil_prod_m3"] = (oil_qi[row_well] * decline * noise).round(2)
+    prod["gas_prod_km3"] = (gas_qi[row_well] * decline * noise).round(2)
+    prod["water_prod_m3"] = (
+        prod["oil_prod_m3"] * rng.lognormal(-1.3, 0.4, len(row_well))
+    ).round(2)
+    group = prod["well_id"]
+    prod["oil_cum_m3"] = prod["oil_prod_m3"].groupby(group).cumsum().round(2)
+    prod["gas_cum_km3"] = prod["gas_prod_km3"].groupby(group).cumsum().round(2)
+    for col in ["depth", "Xcoor", "Ycoor"]:
+        prod[col] = wells[col].to_numpy()[row_well]
+    return prod
+
+
+def _monthly_grid(pairs, rng, concepts=None):
+    """One row per (company, field[, concept]) and reported month.
+
+    Each field reports over its own window of 2 to ~11 years.
+    """
+    lo, hi = _months(FIRST_YEAR, 1), _months(LAST_YEAR, 12) + 1
+    n_months = rng.integers(24, 139, len(pairs))
+    first = lo + (rng.random(len(pairs)) * (hi - lo - n_months)).astype(int)
+    grid = pairs.iloc[np.repeat(np.arange(len(pairs)), n_months)]
+    grid = grid.reset_index(drop=True)
+    grid["m"] = np.concatenate([np.arange(a, a + n) for a, n in zip(first, n_months)])
+    if concepts:
+        grid = grid.merge(pd.DataFrame({"concept": concepts}), how="cross")
+    year, month = grid.pop("m").pipe(lambda m: (m // 12, m % 12 + 1))
+    grid.insert(0, "month", month)
+    grid.insert(0, "year", year)
+    grid.insert(4, "basin", BASIN)
+    return grid
+
+
+def make_drill(pairs, rng):
+    drill = _monthly_grid(pairs, rng, DRILL_CONCEPTS)
+    drill.insert(5, "location", LOCATION)
+    n = len(drill)
+    active = rng.random(n) < 0.10
+    drill["wells"] = np.where(active, rng.geometric(0.4, n), 0).astype(float)
+    drill["meters"] = (drill["wells"] * rng.normal(3200, 900, n)).round(2)
+    drill["date_data"] = (
+        pd.to_datetime({"year": drill["year"], "month": drill["month"], "day": 1})
+        + pd.offsets.MonthEnd(0)
+    ).dt.date
+    return drill
+
+
+def make_comp(pairs, rng):
+    comp = _monthly_grid(pairs, rng)
+    comp["completion"] = rng.poisson(1.0, len(comp))
+    return comp
+
+
+# ------------------------------------------------------------------
+# PUBLIC API
+# ------------------------------------------------------------------
+def generate(out_dir, scale=1.0, seed=0, template_path="data/well_frac_data.csv"):
+    """Write the four app CSV's under ``out_dir`` at ``scale`` x the real size."""
+    t0 = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    os.makedirs(out_dir, exist_ok=True)
+
+    pairs, weights = company_fields(template_path, scale, rng)
+    wells = make_wells(pairs, weights, int(BASE_WELLS * scale), rng)
+
+    make_frac(wells, rng).to_csv(
+        os.path.join(out_dir, "well_frac_data.csv"), index=False
+    )
+    make_drill(pairs, rng).to_csv(os.path.join(out_dir, "drill_data.csv"), index=False)
+    make_comp(pairs, rng).to_csv(
+        os.path.join(out_dir, "completion_data.csv"), index=False
+    )
+
+    prod_path = os.path.join(out_dir, "well_prod_data.csv")
+    n_rows = 0
+    for start in range(0, len(wells), BATCH_WELLS):
+        batch = make_prod(wells.iloc[start : start + BATCH_WELLS], rng)
+        batch.to_csv(
+            prod_path, index=False, mode="w" if start == 0 else "a", header=start == 0
+        )
+        n_rows += len(batch)
+
+    logger.info(
+        "synthetic data x%g in %s: %d wells, %d production rows (%.1fs)",
+        scale,
+        out_dir,
+        len(wells),
+        n_rows,
+        time.perf_counter() - t0,
+    )
+    return out_dir
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    # python -m core.synthetic /tmp/vm_x10 --scale 10
+    parser = argparse.ArgumentParser(description="Write synthetic app CSV's")
+    parser.add_argument("out_dir", help="directory receiving the CSV's")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate(args.out_dir, args.scale, args.seed)
@@ -0,0 +1,97 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+class TablePager:
+    """Serves one sorted page of a (filtered) frame at a time.
+
+    Sort orders are computed once per column on first use and kept as
+    int32 row positions (nulls last), so paging through the whole table
+    costs a ``take`` of ``page_size`` rows per request. Descending order
+    reuses the ascending permutation.
+
+    The orders grow as columns are sorted: ``on_resize`` (set by the
+    result cache holding the pager) is called after each one is added.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.n_rows = len(df)
+        self._orders = {}  # column -> (ascending positions, n_valid)
+        self._lock = threading.Lock()
+        self.on_resize = None
+
+    @property
+    def nbytes(self):
+        """Bytes of the sort orders (the frame belongs to the caller)."""
+        with self._lock:
+            return sum(order.nbytes for order, _ in self._orders.values())
+
+    def page_count(self, page_size):
+        return max(1, -(-self.n_rows // page_size))
+
+    def _order(self, column):
+        with self._lock:
+            entry = self._orders.get(column)
+        if entry is not None:
+            return entry
+
+        values = self.df[column].reset_index(drop=True)
+        valid = values.notna().to_numpy()
+        order = (
+            values[valid]
+            .sort_values(kind="stable")
+            .index.to_numpy(dtype=np.int32)
+        )
+        missing = np.flatnonzero(~valid).astype(np.int32)
+        entry = (np.concatenate((order, missing)), len(order))
+
+        with self._lock:
+            self._orders[column] = entry
+        if self.on_resize is not None:
+            self.on_resize()
+        return entry
+
+    def positions(self, start, stop, column=None, descending=False):
+        """Row positions ``start:stop`` of the table sorted by ``column``."""
+        start, stop = max(0, start), min(self.n_rows, stop)
+        if start >= stop:
+            return np.empty(0, dtype=np.int32)
+        if column is None or column not in self.df.columns:
+            return np.arange(start, stop, dtype=np.int32)
+
+        order, n_valid = self._order(column)
+        if not descending:
+            return order[start:stop]
+        # largest first, nulls still last: the valid part is read backwards
+        valid_start, valid_stop = min(start, n_valid), min(stop, n_valid)
+        head = order[n_valid - valid_stop : n_valid - valid_start][::-1]
+        tail = order[max(start, n_valid) : stop]
+        if not len(tail):
+            return head
+        return np.concatenate((head, tail)) if len(head) else tail
+
+    def page(self, number, page_size, column=None, descending=False):
+        """Rows of 1-based page ``number`` (clamped to the valid range)."""
+        number = min(max(1, int(number)), self.page_count(page_size))
+        start = (number - 1) * page_size
+        rows = self.positions(start, start + page_size, column, descending)
+        return self.df.take(rows).reset_index(drop=True), number
+
+
+def page_label(number, page_count, n_rows):
+    return f"Page {number:,} of {page_count:,} · {n_rows:,} rows"
+
+
+if __name__ == "__main__":
+    frame = pd.DataFrame({"a": [3.0, np.nan, 1.0, 2.0, 5.0], "b": list("vwxyz")})
+    pager = TablePager(frame)
+    assert pager.page(1, 2, "a")[0]["a"].tolist() == [1.0, 2.0]
+    assert pager.page(3, 2, "a")[0]["a"].isna().all()
+    assert pager.page(1, 3, "a", descending=True)[0]["a"].tolist() == [5.0, 3.0, 2.0]
+    assert pager.page(2, 3, "a", descending=True)[0]["a"].tolist()[0] == 1.0
+    assert pager.page(2, 3, "a", descending=True)[0]["a"].isna().tolist() == [0, 1]
+    assert pager.page(9, 2)[1] == 3
+    print(page_label(3, 3, pager.n_rows))
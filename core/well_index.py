@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+
+class WellIndex:
+    """Row positions of every well, in stored order.
+
+    Rows are stored by year partition in ``SORT_KEYS`` order (year, month,
+    well_name, well_id; see core/schema.py), so a well's rows are
+    scattered, but in (year, month) order. ``order`` is the stable
+    permutation that groups them by well, ``key`` then ``tiebreak``, and
+    relies on that: each well's block keeps its rows in (year, month)
+    order. A well's history is the block ``order[start:stop]`` of it.
+    """
+
+    def __init__(self, df, key="well_name", tiebreak="well_id"):
+        self.key = key
+        cat = pd.Categorical(df[key])
+        codes = np.asarray(cat.codes)
+        sort_keys = [codes]
+        if tiebreak in df.columns:
+            sort_keys.insert(0, pd.factorize(df[tiebreak], sort=True)[0])
+        # np.lexsort is stable: the stored (year, month) order survives
+        # within a well
+        self.order = np.lexsort(sort_keys)
+
+        grouped = codes[self.order]
+        change = np.flatnonzero(np.diff(grouped)) + 1
+        starts = np.concatenate(([0], change)) if len(grouped) else change
+        stops = np.concatenate((change, [len(grouped)])) if len(grouped) else change
+
+        self.offsets = {
+            str(cat.categories[grouped[start]]): (int(start), int(stop))
+            for start, stop in zip(starts, stops)
+            if grouped[start] >= 0
+        }
+
+    def __contains__(self, well):
+        return well in self.offsets
+
+    def positions(self, wells):
+        """Row positions of one or several wells, grouped by well."""
+        if isinstance(wells, str):
+            wells = [wells]
+        ranges = [self.offsets[w] for w in wells if w in self.offsets]
+        if not ranges:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([self.order[a:b] for a, b in sorted(ranges)])
+
+    def history(self, df, well):
+        """One well's rows, in (year, month) order."""
+        start, stop = self.offsets.get(well, (0, 0))
+        return df.take(self.order[start:stop])
+
+    def histories(self, df, wells):
+        return df.take(self.positions(wells))
@@ -0,0 +1,258 @@
+"""Multi-process server for the dashboard.
+
+    python serve.py                  # one process, as app.py
+    VM_WORKERS=4 python serve.py     # four workers behind one port
+
+The parent process imports ``app`` once, which maps the shared Arrow
+datasets (``VM_SHARED_DATA=1``) and builds the derived indexes, then forks
+the workers. Base data pages are shared through the page cache and the
+indexes copy-on-write, so each extra worker mostly costs its own sessions.
+Taipy keeps session state inside the worker that served the page, so the
+front proxy pins every browser to one worker with an affinity cookie.
+
+The parent also supervises the workers (one that dies is forked again)
+and is the only process watching the data files: it reloads once, which
+refreshes the Parquet store and the shared maps, then signals every
+worker to swap in the new data.
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import re
+import signal
+import sys
+import threading
+import time
+
+os.environ.setdefault("VM_SHARED_DATA", "1")
+
+logger = logging.getLogger("serve")
+
+
+# ------------------------------------------------------------------
+# CONFIG
+# ------------------------------------------------------------------
+WORKERS = int(os.getenv("VM_WORKERS", "1"))  # opt-in: each worker is a full app
+PORT = int(os.getenv("PORT", "5000"))
+BACKEND_HOST = "127.0.0.1"
+AFFINITY_COOKIE = "vm_worker"
+RESTART_DELAY_S = 1.0  # pause before forking a replacement (no crash spin)
+STOP_TIMEOUT_S = 10.0  # workers still running after this are killed
+
+
+def backend_port(i, port=PORT):
+    return port + 1 + i
+
+
+# ------------------------------------------------------------------
+# STICKY HTTP PROXY
+# ------------------------------------------------------------------
+# Only the head of a connection's first request and of its first response
+# are parsed; the rest is piped as bytes, so HTTP keep-alive and the
+# socket.io websocket of a browser all reach the worker that holds its
+# session. Routing on a cookie rather than the client address keeps
+# clients apart behind reverse proxies and NAT.
+_COOKIE = re.compile(
+    rb"^cookie:[^\r\n]*\b" + AFFINITY_COOKIE.encode() + rb"=(\d+)",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+def cookie_worker(head, n_workers):
+    """Worker index named by the affinity cookie of a request head, or None."""
+    match = _COOKIE.search(head)
+    if match is None or int(match.group(1)) >= n_workers:
+        return None
+    return int(match.group(1))
+
+
+def set_cookie_header(i):
+    return (
+        f"Set-Cookie: {AFFINITY_COOKIE}={i}; Path=/; HttpOnly; SameSite=Lax\r\n"
+    ).encode()
+
+
+async def _pipe(reader, writer):
+    try:
+        while True:
+            chunk = await reader.read(65536)
+            if not chunk:
+                break
+            writer.write(chunk)
+            await writer.drain()
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _pipe_pinned(reader, writer, cookie):
+    """``_pipe`` that adds ``cookie`` to the first response head."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+        writer.close()
+        return
+    end_of_status = head.index(b"\r\n") + 2
+    writer.write(head[:end_of_status] + cookie + head[end_of_status:])
+    await _pipe(reader, writer)
+
+
+async def _serve_client(client_reader, client_writer, ports, turn):
+    try:
+        head = await client_reader.readuntil(b"\r\n\r\n")
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+        client_writer.close()
+        return
+
+    i = cookie_worker(head, len(ports))
+    pin = i is None
+    if pin:
+        i = next(turn) % len(ports)
+    for _ in ports:
+        try:
+            backend_reader, backend_writer = await asyncio.open_connection(
+                BACKEND_HOST, ports[i]
+            )
+            break
+        except OSError as exc:
+            # restarting: its sessions are gone anyway, pin to the next one
+            logger.warning("Worker on port %d unavailable: %s", ports[i], exc)
+            i, pin = (i + 1) % len(ports), True
+    else:
+        client_writer.close()
+        return
+
+    backend_writer.write(head)
+    await asyncio.gather(
+        _pipe(client_reader, backend_writer),
+        (
+            _pipe_pinned(backend_reader, client_writer, set_cookie_header(i))
+            if pin
+            else _pipe(backend_reader, client_writer)
+        ),
+    )
+
+
+async def _proxy(host, port, ports):
+    turn = itertools.count()  # new browsers are spread round-robin
+    server = await asyncio.start_server(
+        lambda r, w: _serve_client(r, w, ports, turn), host, port
+    )
+    async with server:
+        await server.serve_forever()
+
+
+# ------------------------------------------------------------------
+# WORKERS
+# ------------------------------------------------------------------
+# Forks are serialized with the parent's data reloads, so a worker never
+# starts from a process that is halfway through loading, and with shutdown,
+# so no replacement is forked once the workers are being stopped.
+_fork_lock = threading.Lock()
+
+
+def _spawn(i, port):
+    pid = os.fork()  # under _fork_lock
+    if pid:
+        return pid
+    # the parent's handlers (stop, the proxy loop's wakeup fd) are not ours;
+    # a reload signal before app.main installs its handler must not kill us
+    signal.set_wakeup_fd(-1)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    import app
+
+    try:
+        app.main(port=backend_port(i, port), host=BACKEND_HOST, watch=False)
+    finally:
+        os._exit(0)
+
+
+def _supervise(workers, port, stopping):
+    """Reap workers that exit and fork their replacements (parent thread)."""
+    while True:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            return
+        i = workers.pop(pid, None)
+        if i is None or stopping.is_set():
+            continue
+        logger.warning(
+            "Worker %d (pid %d) exited with %d; restarting",
+            i,
+            pid,
+            os.waitstatus_to_exitcode(status),
+        )
+        time.sleep(RESTART_DELAY_S)
+        with _fork_lock:
+            if not stopping.is_set():
+                workers[_spawn(i, port)] = i
+
+
+def _stop_workers(workers, stopping):
+    """Forward SIGTERM to the workers and wait until the supervisor reaps them."""
+    with _fork_lock:
+        stopping.set()
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        for pid in list(workers):
+            try:
+                os.kill(pid, sig)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + STOP_TIMEOUT_S
+        while workers and time.monotonic() < deadline:
+            time.sleep(0.1)
+        if not workers:
+            return
+        logger.warning("Workers %s did not stop; killing them", list(workers))
+
+
+def _reload_workers(workers):
+    """Reload in the parent, then have every worker swap in the new data."""
+    import app
+
+    with _fork_lock:
+        app.reload_data()  # raises (nothing signalled) if the files are invalid
+    for pid in list(workers):
+        try:
+            os.kill(pid, signal.SIGHUP)
+        except ProcessLookupError:
+            pass
+
+
+def run(workers=WORKERS, port=PORT, host="0.0.0.0"):
+    import app  # preload: map data and build indexes once, before forking
+    from core.reloader import DataWatcher
+
+    if workers <= 1:
+        app.main(port=port, host=host)
+        return
+
+    with _fork_lock:
+        pids = {_spawn(i, port): i for i in range(workers)}  # pid -> worker index
+    logger.info("Serving on port %d with %d workers: %s", port, workers, list(pids))
+
+    stopping = threading.Event()
+    threading.Thread(
+        target=_supervise, args=(pids, port, stopping), name="supervisor", daemon=True
+    ).start()
+    DataWatcher(app.DATA_PATHS.values(), lambda: _reload_workers(pids)).start()
+
+    def stop(*_):
+        _stop_workers(pids, stopping)
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    ports = [backend_port(i, port) for i in range(workers)]
+    asyncio.run(_proxy(host, port, ports))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run()